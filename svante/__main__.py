@@ -9,11 +9,14 @@ from .combine import combine
 from .common import APP
 from .common import NAME
 from .common import STATE
+from .pipeline import run
 from .plot import plot
+from .predict import predict
+from .synth import synth
 
 
 # global constants
-unused_cli_funcs = (combine, plot)
+unused_cli_funcs = (combine, plot, predict, run, synth)
 VERSION: str = metadata.version(NAME)
 click_object = typer.main.get_command(APP)
 
@@ -0,0 +1,205 @@
+"""Sidecar caches of parsed rate tables and their fits."""
+# standard library imports
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from .common import INVERSE_T_COL
+from .fit import LineFits
+
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from pathlib import Path
+
+    from .config import CombinedRate
+
+
+# global constants
+CACHE_VERSION = 1
+ARRAY_SUFFIX = ".cache.npy"
+META_SUFFIX = ".cache.json"
+FITS_VERSION = 1
+FITS_SUFFIX = ".fits.json"
+SAVED_FIT_FIELDS = (
+    "intercept",
+    "slope",
+    "intercept_std",
+    "slope_std",
+    "covariance",
+    "residual_var",
+    "n_points",
+    "chi2",
+)
+
+
+def sidecar_paths(table_path: Path) -> tuple[Path, Path]:
+    """Return paths of the sidecar array and metadata files."""
+    return (
+        table_path.with_name(table_path.name + ARRAY_SUFFIX),
+        table_path.with_name(table_path.name + META_SUFFIX),
+    )
+
+
+def parse_combined(table_path: Path) -> pd.DataFrame:
+    """Parse a combined TSV table and add the inverse-temperature column."""
+    df = pd.read_csv(
+        table_path, sep="\t", index_col=0, float_precision="round_trip"
+    )
+    df[INVERSE_T_COL] = 1000.0 / df.index
+    return df
+
+
+def source_signature(table_path: Path) -> dict[str, int]:
+    """Return the size and modification time used to validate a sidecar."""
+    st = table_path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _read_sidecar(table_path: Path) -> pd.DataFrame | None:
+    """Open a valid sidecar by memory mapping, or return None if stale."""
+    array_path, meta_path = sidecar_paths(table_path)
+    if not (array_path.exists() and meta_path.exists()):
+        return None
+    try:
+        with meta_path.open() as fh:
+            meta: dict[str, Any] = json.load(fh)
+        if (
+            meta.get("version") != CACHE_VERSION
+            or meta.get("source") != source_signature(table_path)
+        ):
+            logger.debug(f'sidecar cache of "{table_path}" is stale')
+            return None
+        columns = meta["columns"]
+        index_dtype = np.dtype(meta["index_dtype"])
+        index_name = meta["index_name"]
+        arr = np.load(array_path, mmap_mode="r")
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.debug(f'unable to read sidecar cache of "{table_path}": {e}')
+        return None
+    if arr.ndim != 2 or arr.shape[1] != len(columns) + 1:
+        logger.debug(f'sidecar cache of "{table_path}" has wrong shape')
+        return None
+    index = pd.Index(
+        np.asarray(arr[:, 0]).astype(index_dtype), name=index_name
+    )
+    # Fortran-ordered columns map to a single block without copying.
+    return pd.DataFrame(arr[:, 1:], index=index, columns=columns, copy=False)
+
+
+def _write_sidecar(table_path: Path, df: pd.DataFrame) -> bool:
+    """Write parsed columns to sidecar files, returning success."""
+    if not all(pd.api.types.is_numeric_dtype(t) for t in df.dtypes):
+        logger.debug(f'not caching "{table_path}": non-numeric columns')
+        return False
+    array_path, meta_path = sidecar_paths(table_path)
+    arr = np.empty((len(df), len(df.columns) + 1), dtype=float, order="F")
+    arr[:, 0] = df.index.to_numpy(dtype=float)
+    arr[:, 1:] = df.to_numpy(dtype=float)
+    meta = {
+        "version": CACHE_VERSION,
+        "source": source_signature(table_path),
+        "index_name": df.index.name,
+        "index_dtype": str(df.index.dtype),
+        "columns": [str(c) for c in df.columns],
+    }
+    try:
+        # Write to temporary names and rename so readers never see
+        # partial files; metadata goes last since it validates the array.
+        tmp_array = array_path.with_name(array_path.name + ".tmp")
+        with tmp_array.open("wb") as fh:
+            np.save(fh, arr)
+        tmp_array.replace(array_path)
+        tmp_meta = meta_path.with_name(meta_path.name + ".tmp")
+        with tmp_meta.open("w") as fh:
+            json.dump(meta, fh, indent=1)
+        tmp_meta.replace(meta_path)
+    except OSError as e:
+        logger.debug(f'unable to write sidecar cache of "{table_path}": {e}')
+        return False
+    return True
+
+
+def load_combined(table_path: Path, use_cache: bool = True) -> pd.DataFrame:
+    """Load a combined table, using a memory-mapped sidecar when valid."""
+    if not use_cache:
+        return parse_combined(table_path)
+    if (df := _read_sidecar(table_path)) is not None:
+        logger.debug(f'using sidecar cache of "{table_path}"')
+        return df
+    df = parse_combined(table_path)
+    if _write_sidecar(table_path, df):
+        logger.debug(f'wrote sidecar cache of "{table_path}"')
+        if (mapped := _read_sidecar(table_path)) is not None:
+            return mapped
+    return df
+
+
+def fits_path(table_path: Path) -> Path:
+    """Return path of the saved fits of a combined table."""
+    return table_path.with_name(table_path.name + FITS_SUFFIX)
+
+
+def save_fits(
+    table_path: Path, rates: Sequence[CombinedRate], fits: LineFits
+) -> bool:
+    """Save fit parameters and covariances of a table, returning success."""
+    saved: dict[str, Any] = {
+        "version": FITS_VERSION,
+        "rates": {
+            rate.name: {
+                "method": rate.fit,
+                **{
+                    field: getattr(fits, field)[i].item()
+                    for field in SAVED_FIT_FIELDS
+                },
+            }
+            for i, rate in enumerate(rates)
+        },
+    }
+    path = fits_path(table_path)
+    try:
+        saved["source"] = source_signature(table_path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("w") as fh:
+            json.dump(saved, fh, indent=1)
+        tmp_path.replace(path)
+    except OSError as e:
+        logger.warning(f'unable to save fits of "{table_path}": {e}')
+        return False
+    return True
+
+
+def load_fits(
+    table_path: Path, rates: Sequence[CombinedRate]
+) -> LineFits | None:
+    """Load saved fits if they match the table and fit methods."""
+    path = fits_path(table_path)
+    try:
+        with path.open() as fh:
+            saved: dict[str, Any] = json.load(fh)
+        if saved.get("version") != FITS_VERSION or saved.get(
+            "source"
+        ) != source_signature(table_path):
+            logger.debug(f'saved fits of "{table_path}" are stale')
+            return None
+        params = [saved["rates"][rate.name] for rate in rates]
+    except (OSError, ValueError, KeyError) as e:
+        logger.debug(f'no usable saved fits of "{table_path}": {e}')
+        return None
+    if any(p["method"] != rate.fit for p, rate in zip(params, rates)):
+        logger.debug(f'saved fits of "{table_path}" use other methods')
+        return None
+    return LineFits(
+        **{
+            field: np.array([p[field] for p in params])
+            for field in SAVED_FIT_FIELDS
+        },
+        outliers=np.zeros((0, len(params)), dtype=bool),
+    )
@@ -2,7 +2,10 @@
 # standard library imports
 import sys
 from pathlib import Path
+from typing import Optional
+from typing import Union
 
+import numpy as np
 import pandas as pd
 from loguru import logger
 from statsdict import Stat
@@ -11,44 +14,52 @@ from .common import APP
 from .common import STATE
 from .common import STATS
 from .common import read_conf_file
+from .config import CombineConfig
+from .config import RunConfig
+from .tsv import write_tsv
 
 
 @APP.command()
 @STATS.auto_save_and_report
 def combine(toml_file: Path) -> None:
     """Combine rate info from multiple files."""
-    conf = read_conf_file(toml_file, "configuration file", "combine")
-    inputs = conf["inputs"]
-    outputs = conf["combined"]["rates"]
-    logger.info(
-        f'reading {len(inputs)} sets of {conf["combined"]["title"]} data:'
+    conf = read_conf_file(toml_file, "configuration file", CombineConfig)
+    combined = combine_inputs(conf)
+    write_combined(
+        combined,
+        conf.combined.filename,
+        sig_figs=conf.combined.significant_figures,
     )
+
+
+def combine_inputs(conf: Union[CombineConfig, RunConfig]) -> pd.DataFrame:
+    """Read input rate tables and combine them into one table."""
+    inputs = conf.inputs
+    outputs = conf.combined.rates
+    logger.info(f"reading {len(inputs)} sets of {conf.combined.title} data:")
     frames = []
     output_cols = ["±T"]
     delta_t_cols = []
     for i, dataset in enumerate(inputs):
-        uri = dataset["uri"]
-        df = pd.read_csv(uri, sep="\t", index_col=dataset["T"]["col"])
+        uri = dataset.uri
+        df = pd.read_csv(uri, sep="\t", index_col=dataset.temperature.col)
         df.index.name = "T"
-        rate_col_in = dataset["rate"]["name"]
-        rate_col_out = outputs[i]["name"]
-        uncertainty_col_in = dataset["rate"]["uncertainties"]
+        rate_col_in = dataset.rate.name
+        rate_col_out = outputs[i].name
+        uncertainty_col_in = dataset.rate.uncertainties
         uncertainty_col_out = "±" + rate_col_out
-        output_cols += [rate_col_out, uncertainty_col_out]
         t_uncertainty_col = f"±T.{rate_col_out}"
+        output_cols += [rate_col_out, uncertainty_col_out, t_uncertainty_col]
         delta_t_cols.append(t_uncertainty_col)
-        if "uncertainty" in dataset["T"]:
-            df[t_uncertainty_col] = dataset["T"]["uncertainty"]
-        elif "uncertainties" in dataset["T"]:
-            df[t_uncertainty_col] = df[dataset["T"]["uncertainties"]]
+        if dataset.temperature.uncertainty is not None:
+            df[t_uncertainty_col] = dataset.temperature.uncertainty
+        elif dataset.temperature.uncertainties is not None:
+            df[t_uncertainty_col] = df[dataset.temperature.uncertainties]
         else:
             logger.error(
                 "Neither T uncertainty value nor uncertainty column found"
             )
             sys.exit(1)
-        n_points = len(df)
-        t_min = df.index.min()
-        t_max = df.index.max()
         df.rename(
             columns={
                 rate_col_in: rate_col_out,
@@ -57,9 +68,30 @@ def combine(toml_file: Path) -> None:
             inplace=True,
         )
         df = df[[t_uncertainty_col, rate_col_out, uncertainty_col_out]]
+        if dataset.aggregate is not None:
+            n_replicates = len(df)
+            try:
+                df = aggregate_replicates(df, dataset.aggregate.bin_width)
+            except ValueError as e:
+                logger.error(f"unable to aggregate replicates in {uri}")
+                logger.error(e)
+                sys.exit(1)
+            logger.info(
+                f"   {uri}: {n_replicates} replicates aggregated to"
+                f" {len(df)} temperatures"
+            )
+        elif df.index.has_duplicates:
+            logger.error(
+                f"{uri} has repeated temperatures, use [inputs.aggregate]"
+                " to combine replicates"
+            )
+            sys.exit(1)
+        n_points = len(df)
+        t_min = df.index.min()
+        t_max = df.index.max()
         logger.info(f"   {uri}: {n_points} points from {t_min} to {t_max} K")
         if STATE["verbose"]:
-            print(rf'   {outputs[i]["label"]}')
+            print(rf"   {outputs[i].label}")
             print(df)
         frames.append(df)
     combined = pd.concat(frames, axis=1)
@@ -68,12 +100,108 @@ def combine(toml_file: Path) -> None:
     t_min = float(combined.index.min())
     t_max = float(combined.index.max())
     n_points = len(combined)
-    output_file = conf["combined"]["filename"]
     if STATE["verbose"]:
         print(combined)
     logger.info(f"{n_points} points from {t_min} to {t_max} K")
     STATS["n_points"] = Stat(n_points)
     STATS["T_min"] = Stat(t_min, desc="min temperature", units="K")
     STATS["T_max"] = Stat(t_max, desc="max temperature", units="K")
+    return combined
+
+
+def aggregate_replicates(
+    df: pd.DataFrame, bin_width: Optional[float] = None
+) -> pd.DataFrame:
+    """Reduce replicate rates to one row per temperature or bin.
+
+    Columns are the temperature uncertainty, rate, and rate uncertainty.
+    Rates are averaged with inverse-variance weights.  The uncertainty
+    of the mean is inflated by the Birge ratio when replicates scatter
+    more than their stated uncertainties.  Replicates with missing or
+    non-positive uncertainties carry no weight, and groups with none
+    better fall back to an unweighted mean and its standard error.
+    Temperature uncertainty adds the RMS distance of replicate
+    temperatures from the bin centre to the mean stated variance.
+
+    Raises ValueError if there are no rates, or if a group holds a
+    single replicate without a usable uncertainty.
+    """
+    t_uncert_col, rate_col, uncert_col = df.columns
+    measured = np.isfinite(df[rate_col].to_numpy(dtype=float))
+    if not measured.any():
+        raise ValueError(f"no values of {rate_col}")
+    temps = df.index.to_numpy(dtype=float)[measured]
+    rates = df[rate_col].to_numpy(dtype=float)[measured]
+    sigmas = df[uncert_col].to_numpy(dtype=float)[measured]
+    t_vars = df[t_uncert_col].to_numpy(dtype=float)[measured] ** 2
+    usable = np.isfinite(sigmas) & (sigmas > 0.0)
+    if not usable.all():
+        logger.warning(
+            f"   {(~usable).sum()} replicates of {rate_col} have no"
+            " usable uncertainty"
+        )
+    weights = np.divide(
+        1.0, sigmas**2, out=np.zeros_like(sigmas), where=usable
+    )
+    if bin_width is None:
+        keys = temps
+    else:
+        # Rounding to the decimals of bin_width keeps centres such as
+        # 190.1 from being written as 190.10000000000002.
+        places = len(np.format_float_positional(bin_width).partition(".")[2])
+        keys = np.round(np.round(temps / bin_width) * bin_width, places)
+    sums = (
+        pd.DataFrame(
+            {
+                "w": weights,
+                "wk": weights * rates,
+                "wkk": weights * rates**2,
+                "n_w": usable.astype(int),
+                "k": rates,
+                "kk": rates**2,
+                "n": 1,
+                "t_var": t_vars,
+                "t_dev": (temps - keys) ** 2,
+            },
+            index=pd.Index(keys, name=df.index.name),
+        )
+        .groupby(level=0, sort=True)
+        .sum()
+    )
+    weighted = sums["w"] > 0.0
+    unweighted_n = sums["n"].where(~weighted)
+    if (unweighted_n == 1).any():
+        lone = sums.index[unweighted_n == 1].tolist()
+        raise ValueError(
+            f"single replicates of {rate_col} without usable uncertainty"
+            f" at T = {lone}"
+        )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weighted_mean = sums["wk"] / sums["w"]
+        chi2 = (sums["wkk"] - sums["wk"] * weighted_mean).clip(lower=0.0)
+        dof = (sums["n_w"] - 1).where(sums["n_w"] > 1)
+        birge = ((chi2 / dof) ** 0.5).fillna(1.0).clip(lower=1.0)
+        plain_mean = sums["k"] / sums["n"]
+        plain_var = (sums["kk"] - sums["k"] * plain_mean).clip(lower=0.0) / (
+            sums["n"] - 1
+        )
+        weighted_sigma = birge / sums["w"] ** 0.5
+        plain_sigma = (plain_var / sums["n"]) ** 0.5
+        t_sigma = ((sums["t_var"] + sums["t_dev"]) / sums["n"]) ** 0.5
+    return pd.DataFrame(
+        {
+            t_uncert_col: t_sigma,
+            rate_col: weighted_mean.where(weighted, plain_mean),
+            uncert_col: weighted_sigma.where(weighted, plain_sigma),
+        }
+    )
+
+
+def write_combined(
+    combined: pd.DataFrame,
+    output_file: str,
+    sig_figs: Optional[int] = None,
+) -> None:
+    """Write combined table as TSV, by default without loss of precision."""
     logger.info(f"written to {output_file}")
-    combined.to_csv(output_file, sep="\t", float_format="%.4f")
+    write_tsv(combined, Path(output_file), sig_figs=sig_figs)
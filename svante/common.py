@@ -4,31 +4,36 @@ from __future__ import annotations
 
 import sys
 from typing import TYPE_CHECKING  # pylint: disable=no-name-in-module
-from typing import Any
 from typing import TypedDict  # pylint: disable=no-name-in-module
 
 import loguru
 import toml
 import typer
 from loguru import logger
-from schema import And  # type: ignore
-from schema import Optional  # type: ignore
-from schema import Schema  # type: ignore
-from schema import SchemaError  # type: ignore
-from schema import Use  # type: ignore
+from scipy.constants import gas_constant  # type: ignore
 from statsdict import StatsDict
 
 from . import __doc__ as docstring
+from .config import ConfigError
+from .config import load_config
 
 
 if TYPE_CHECKING:
     from pathlib import Path
 
+    from .config import ConfigType
+
 
 # global constants
 DEFAULT_STDERR_LOG_LEVEL = "INFO"
 NO_LEVEL_BELOW = 30  # Don't print level for messages below this level
 NAME = "svante"
+INVERSE_T_COL = "1000/T"
+R = gas_constant / 1000.0  # kJ/mol⋅K
+LOG10_TO_E = 2.303
+CACHE_OPTION = typer.Option(
+    True, help="Use binary sidecar cache of combined table."
+)
 
 
 class GlobalState(TypedDict):
@@ -41,76 +46,6 @@ class GlobalState(TypedDict):
 STATE: GlobalState = {"verbose": False, "log_level": DEFAULT_STDERR_LOG_LEVEL}
 
 
-INPUTS_SCHEMA = Schema(
-    [
-        {
-            "uri": And(str, len),
-            "T": Schema({"col": int, "uncertainty": Use(float)}),
-            "rate": Schema(
-                {"name": And(str, len), "uncertainties": And(str, len)}
-            ),
-        }
-    ]
-)
-COMBINED_SCHEMA = Schema(
-    {
-        "title": And(str, len),
-        "filename": And(str, len),
-        "rates": [
-            Schema(
-                {
-                    "name": And(str, len),
-                    "label": And(str, len),
-                    "line_label_loc": [float],
-                }
-            )
-        ],
-    }
-)
-PLOT_SCHEMA = Schema(
-    {
-        "secondary_axis_units": And(str, len),
-        "y_label": And(str, len),
-        "add_fit_values": bool,
-        "savefig": Schema(
-            {
-                "filename": And(str, len),
-                "format": And(str, len),
-                "dpi": int,
-                "facecolor": And(str, len),
-                "edgecolor": And(str, len),
-                "transparent": bool,
-                "pad_inches": float,
-            }
-        ),
-        "ratios": [
-            Schema(
-                {
-                    "numerator": And(str, len),
-                    "denominator": And(str, len),
-                    "name": And(str, len),
-                    "title": And(str, len),
-                }
-            )
-        ],
-    }
-)
-COMBINE_SCHEMA = Schema(
-    {
-        "inputs": INPUTS_SCHEMA,
-        "combined": COMBINED_SCHEMA,
-        Optional("plot"): PLOT_SCHEMA,
-    }
-)
-PLOTTING_SCHEMA = Schema(
-    {
-        Optional("inputs"): INPUTS_SCHEMA,
-        "combined": COMBINED_SCHEMA,
-        "plot": PLOT_SCHEMA,
-    }
-)
-
-
 def _stderr_format_func(record: loguru.Record) -> str:
     """Do level-sensitive formatting."""
     if record["level"].no < NO_LEVEL_BELOW:
@@ -128,31 +63,26 @@ STATS = StatsDict(logger=logger, app=APP, module_name=NAME)
 def read_conf_file(
     toml_path: Path,
     file_desc: str,
-    schema_type: str,
-) -> Any:
-    """Read TOML configuration and verify against schema."""
+    config_type: type[ConfigType],
+) -> ConfigType:
+    """Read TOML configuration and validate it as a config class."""
     if not toml_path.exists():
         logger.error(f'{file_desc} file "{toml_path}" does not exist')
         sys.exit(1)
     try:
-        toml_dict = toml.load(toml_path)
-    except TypeError:
+        return load_config(toml_path, config_type)
+    except OSError:
         logger.error(f'Error in {file_desc} filename "{toml_path}"')
         sys.exit(1)
     except toml.TomlDecodeError as e:
         logger.error(f"File {toml_path} is not valid TOML:")
         logger.error(e)
         sys.exit(1)
-    if schema_type == "combine":
-        file_schema = COMBINE_SCHEMA
-    elif schema_type == "plot":
-        file_schema = PLOTTING_SCHEMA
-    else:
-        logger.error(f"unknown schema type {schema_type}")
+    except ConfigError as e:
+        logger.error(f'{len(e.errors)} error(s) in {file_desc} "{toml_path}":')
+        for error in e.errors:
+            logger.error(f"   {error}")
         sys.exit(1)
-    try:
-        validated = file_schema.validate(toml_dict)
-    except SchemaError as e:
+    except ValueError as e:
         logger.error(e)
         sys.exit(1)
-    return validated
@@ -0,0 +1,467 @@
+"""Typed configuration objects with compiled, memoized validation."""
+# standard library imports
+from __future__ import annotations
+
+import hashlib
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+from typing import TypeVar
+from typing import Union
+
+import attrs
+import toml
+
+from .tsv import MAX_SIG_FIGS
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+# global constants
+FIT_METHODS = ("ols", "huber", "theil-sen", "ransac")
+LAYOUTS = ("single", "grid")
+INVALID = object()  # marks a value that failed validation
+
+Checker = Callable[[Any, str, "list[str]"], Any]
+
+
+class ConfigError(ValueError):
+    """Configuration failed validation, with every error found."""
+
+    def __init__(self, errors: list[str]) -> None:
+        """Save the list of errors."""
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+
+def _meta(check: Checker, key: str | None = None) -> dict[str, Any]:
+    """Return field metadata giving value checker and TOML key."""
+    return {"check": check, "key": key}
+
+
+# value checkers, each returning a converted value or INVALID
+
+
+def _nonempty_str(value: Any, path: str, errors: list[str]) -> Any:
+    """Check for a non-empty string."""
+    if isinstance(value, str) and value:
+        return value
+    errors.append(f"{path}: expected non-empty string, got {value!r}")
+    return INVALID
+
+
+def _int(value: Any, path: str, errors: list[str]) -> Any:
+    """Check for an integer."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    errors.append(f"{path}: expected integer, got {value!r}")
+    return INVALID
+
+
+def _positive_int(value: Any, path: str, errors: list[str]) -> Any:
+    """Check for a positive integer."""
+    if _int(value, path, errors) is INVALID:
+        return INVALID
+    if value > 0:
+        return value
+    errors.append(f"{path}: expected positive integer, got {value!r}")
+    return INVALID
+
+
+def _sig_figs(value: Any, path: str, errors: list[str]) -> Any:
+    """Check for a usable number of significant figures."""
+    if _positive_int(value, path, errors) is INVALID:
+        return INVALID
+    if value <= MAX_SIG_FIGS:
+        return value
+    errors.append(f"{path}: at most {MAX_SIG_FIGS} figures are meaningful")
+    return INVALID
+
+
+def _float(value: Any, path: str, errors: list[str]) -> Any:
+    """Check for a number and convert it to float."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    errors.append(f"{path}: expected number, got {value!r}")
+    return INVALID
+
+
+def _positive_float(value: Any, path: str, errors: list[str]) -> Any:
+    """Check for a positive number and convert it to float."""
+    if _float(value, path, errors) is INVALID:
+        return INVALID
+    if value > 0:
+        return float(value)
+    errors.append(f"{path}: expected positive number, got {value!r}")
+    return INVALID
+
+
+def _bool(value: Any, path: str, errors: list[str]) -> Any:
+    """Check for a boolean."""
+    if isinstance(value, bool):
+        return value
+    errors.append(f"{path}: expected true or false, got {value!r}")
+    return INVALID
+
+
+def _choice(*options: str) -> Checker:
+    """Return checker for one of a fixed set of strings."""
+
+    def check(value: Any, path: str, errors: list[str]) -> Any:
+        """Check for one of the options."""
+        if value in options:
+            return value
+        errors.append(f"{path}: expected one of {options}, got {value!r}")
+        return INVALID
+
+    return check
+
+
+def _list_of(item_check: Checker, length: int | None = None) -> Checker:
+    """Return checker for a list whose items are checked in turn."""
+
+    def check(value: Any, path: str, errors: list[str]) -> Any:
+        """Check every item of a list."""
+        if not isinstance(value, list):
+            errors.append(f"{path}: expected list, got {value!r}")
+            return INVALID
+        if length is not None and len(value) != length:
+            errors.append(f"{path}: expected {length} items, got {len(value)}")
+            return INVALID
+        items = tuple(
+            item_check(item, f"{path}[{i}]", errors)
+            for i, item in enumerate(value)
+        )
+        return INVALID if INVALID in items else items
+
+    return check
+
+
+def _table(cls: type) -> Checker:
+    """Return checker that builds a config class from a TOML table."""
+
+    def check(value: Any, path: str, errors: list[str]) -> Any:
+        """Check a table against its compiled validator."""
+        return _VALIDATORS[cls](value, path, errors)
+
+    return check
+
+
+def _compile(cls: type) -> Checker:
+    """Compile the field declarations of a config class into a validator.
+
+    Field metadata are looked up once here rather than on every table.
+    """
+    fields = [
+        (
+            f.metadata["key"] or f.name,
+            f.name,
+            f.metadata["check"],
+            f.default is attrs.NOTHING,
+        )
+        for f in attrs.fields(cls)
+    ]
+    known_keys = frozenset(key for key, _, _, _ in fields)
+
+    def validate(value: Any, path: str, errors: list[str]) -> Any:
+        """Check a table and build the config object."""
+        if not isinstance(value, dict):
+            errors.append(f"{path}: expected table, got {value!r}")
+            return INVALID
+        n_errors = len(errors)
+        kwargs = {}
+        for key, name, check, required in fields:
+            key_path = f"{path}.{key}" if path else key
+            if key in value:
+                kwargs[name] = check(value[key], key_path, errors)
+            elif required:
+                errors.append(f"{key_path}: missing")
+        prefix = f"{path}." if path else ""
+        errors.extend(
+            f"{prefix}{key}: unexpected key"
+            for key in value
+            if key not in known_keys
+        )
+        if len(errors) > n_errors:
+            return INVALID
+        try:
+            return cls(**kwargs)
+        except ValueError as e:
+            errors.append(f"{path}: {e}")
+            return INVALID
+
+    return validate
+
+
+@attrs.frozen
+class TemperatureSpec:
+    """Temperature column of an input and its uncertainty."""
+
+    col: int = attrs.field(metadata=_meta(_int))
+    uncertainty: float | None = attrs.field(
+        metadata=_meta(_float), default=None
+    )
+    uncertainties: str | None = attrs.field(
+        metadata=_meta(_nonempty_str), default=None
+    )
+
+    def __attrs_post_init__(self) -> None:
+        """Require exactly one source of temperature uncertainty."""
+        if (self.uncertainty is None) == (self.uncertainties is None):
+            raise ValueError("need one of uncertainty or uncertainties")
+
+
+@attrs.frozen
+class RateSpec:
+    """Rate column of an input and its uncertainty column."""
+
+    name: str = attrs.field(metadata=_meta(_nonempty_str))
+    uncertainties: str = attrs.field(metadata=_meta(_nonempty_str))
+
+
+@attrs.frozen
+class AggregateSpec:
+    """Grouping of replicate measurements by temperature."""
+
+    bin_width: float | None = attrs.field(
+        metadata=_meta(_positive_float), default=None
+    )  # K, exact temperatures if None
+
+
+@attrs.frozen
+class InputSpec:
+    """One input table of rates."""
+
+    uri: str = attrs.field(metadata=_meta(_nonempty_str))
+    temperature: TemperatureSpec = attrs.field(
+        metadata=_meta(_table(TemperatureSpec), key="T")
+    )
+    rate: RateSpec = attrs.field(metadata=_meta(_table(RateSpec)))
+    aggregate: AggregateSpec | None = attrs.field(
+        metadata=_meta(_table(AggregateSpec)), default=None
+    )
+
+
+@attrs.frozen
+class CombinedRate:
+    """Name, label, and fit method of one rate in the combined table."""
+
+    name: str = attrs.field(metadata=_meta(_nonempty_str))
+    label: str = attrs.field(metadata=_meta(_nonempty_str))
+    line_label_loc: tuple[float, float] = attrs.field(
+        metadata=_meta(_list_of(_float, length=2))
+    )
+    fit: str = attrs.field(
+        metadata=_meta(_choice(*FIT_METHODS)), default="ols"
+    )
+
+
+@attrs.frozen
+class CombinedSpec:
+    """Combined table of rates."""
+
+    title: str = attrs.field(metadata=_meta(_nonempty_str))
+    filename: str = attrs.field(metadata=_meta(_nonempty_str))
+    rates: tuple[CombinedRate, ...] = attrs.field(
+        metadata=_meta(_list_of(_table(CombinedRate)))
+    )
+    significant_figures: int | None = attrs.field(
+        metadata=_meta(_sig_figs), default=None
+    )
+
+
+@attrs.frozen
+class GridSpec:
+    """Small-multiples layout parameters."""
+
+    columns: int = attrs.field(metadata=_meta(_positive_int), default=3)
+    panel_size: tuple[float, float] = attrs.field(
+        metadata=_meta(_list_of(_float, length=2)), default=(4.0, 3.2)
+    )  # inches
+    workers: int | None = attrs.field(
+        metadata=_meta(_positive_int), default=None
+    )
+    parallel_threshold: int = attrs.field(
+        metadata=_meta(_int), default=16
+    )  # panels
+
+
+@attrs.frozen
+class SaveFigSpec:
+    """Arguments to savefig."""
+
+    filename: str = attrs.field(metadata=_meta(_nonempty_str))
+    format: str = attrs.field(metadata=_meta(_nonempty_str))
+    dpi: int = attrs.field(metadata=_meta(_int))
+    facecolor: str = attrs.field(metadata=_meta(_nonempty_str))
+    edgecolor: str = attrs.field(metadata=_meta(_nonempty_str))
+    transparent: bool = attrs.field(metadata=_meta(_bool))
+    pad_inches: float = attrs.field(metadata=_meta(_float))
+
+
+@attrs.frozen
+class RatioSpec:
+    """Ratio of two rates to be plotted."""
+
+    numerator: str = attrs.field(metadata=_meta(_nonempty_str))
+    denominator: str = attrs.field(metadata=_meta(_nonempty_str))
+    name: str = attrs.field(metadata=_meta(_nonempty_str))
+    title: str = attrs.field(metadata=_meta(_nonempty_str))
+
+
+@attrs.frozen
+class PlotSpec:
+    """Plot and fit parameters."""
+
+    secondary_axis_units: str = attrs.field(metadata=_meta(_nonempty_str))
+    y_label: str = attrs.field(metadata=_meta(_nonempty_str))
+    add_fit_values: bool = attrs.field(metadata=_meta(_bool))
+    savefig: SaveFigSpec = attrs.field(metadata=_meta(_table(SaveFigSpec)))
+    ratios: tuple[RatioSpec, ...] = attrs.field(
+        metadata=_meta(_list_of(_table(RatioSpec)))
+    )
+    layout: str = attrs.field(
+        metadata=_meta(_choice(*LAYOUTS)), default="single"
+    )
+    grid: GridSpec = attrs.field(
+        metadata=_meta(_table(GridSpec)), default=GridSpec()
+    )
+
+
+# Each command has its own configuration class, in which the sections
+# it needs are required and so never None.
+
+
+@attrs.frozen(kw_only=True)
+class CombineConfig:
+    """Validated configuration of svante combine."""
+
+    inputs: tuple[InputSpec, ...] = attrs.field(
+        metadata=_meta(_list_of(_table(InputSpec)))
+    )
+    combined: CombinedSpec = attrs.field(metadata=_meta(_table(CombinedSpec)))
+    plot: PlotSpec | None = attrs.field(
+        metadata=_meta(_table(PlotSpec)), default=None
+    )
+
+
+@attrs.frozen(kw_only=True)
+class PlotConfig:
+    """Validated configuration of svante plot."""
+
+    inputs: tuple[InputSpec, ...] = attrs.field(
+        metadata=_meta(_list_of(_table(InputSpec))), default=()
+    )
+    combined: CombinedSpec = attrs.field(metadata=_meta(_table(CombinedSpec)))
+    plot: PlotSpec = attrs.field(metadata=_meta(_table(PlotSpec)))
+
+
+@attrs.frozen(kw_only=True)
+class RunConfig:
+    """Validated configuration of svante run."""
+
+    inputs: tuple[InputSpec, ...] = attrs.field(
+        metadata=_meta(_list_of(_table(InputSpec)))
+    )
+    combined: CombinedSpec = attrs.field(metadata=_meta(_table(CombinedSpec)))
+    plot: PlotSpec = attrs.field(metadata=_meta(_table(PlotSpec)))
+
+
+@attrs.frozen(kw_only=True)
+class PredictConfig:
+    """Validated configuration of svante predict."""
+
+    inputs: tuple[InputSpec, ...] = attrs.field(
+        metadata=_meta(_list_of(_table(InputSpec))), default=()
+    )
+    combined: CombinedSpec = attrs.field(metadata=_meta(_table(CombinedSpec)))
+    plot: PlotSpec | None = attrs.field(
+        metadata=_meta(_table(PlotSpec)), default=None
+    )
+
+
+Config = Union[CombineConfig, PlotConfig, RunConfig, PredictConfig]
+ConfigType = TypeVar("ConfigType", bound=Config)
+
+
+_VALIDATORS: dict[type, Checker] = {
+    cls: _compile(cls)
+    for cls in (
+        TemperatureSpec,
+        RateSpec,
+        AggregateSpec,
+        InputSpec,
+        CombinedRate,
+        CombinedSpec,
+        GridSpec,
+        SaveFigSpec,
+        RatioSpec,
+        PlotSpec,
+        CombineConfig,
+        PlotConfig,
+        RunConfig,
+        PredictConfig,
+    )
+}
+# (path, config class) -> (size, mtime, digest), and digest -> config
+_STAT_CACHE: dict[tuple[str, type], tuple[int, int, str]] = {}
+_DIGEST_CACHE: dict[tuple[str, type], Any] = {}
+
+
+def parse_config(
+    toml_dict: dict[str, Any], config_type: type[ConfigType]
+) -> ConfigType:
+    """Validate a parsed TOML dictionary, reporting all errors at once."""
+    errors: list[str] = []
+    conf = _VALIDATORS[config_type](toml_dict, "", errors)
+    if conf is not INVALID:
+        _check_references(conf, errors)
+    if errors:
+        raise ConfigError(errors)
+    validated: ConfigType = conf
+    return validated
+
+
+def _check_references(conf: Config, errors: list[str]) -> None:
+    """Check consistency between sections."""
+    n_rates = len(conf.combined.rates)
+    if conf.inputs and len(conf.inputs) != n_rates:
+        errors.append(
+            f"combined.rates: {n_rates} rates for {len(conf.inputs)} inputs"
+        )
+    if conf.plot is None:
+        return
+    rate_names = {rate.name for rate in conf.combined.rates}
+    for i, ratio in enumerate(conf.plot.ratios):
+        for key in ("numerator", "denominator"):
+            if getattr(ratio, key) not in rate_names:
+                errors.append(
+                    f"plot.ratios[{i}].{key}: unknown rate"
+                    f" {getattr(ratio, key)!r}"
+                )
+
+
+def load_config(toml_path: Path, config_type: type[ConfigType]) -> ConfigType:
+    """Read and validate a TOML file, memoized by path, mtime, and hash.
+
+    Raises OSError if the file cannot be read, toml.TomlDecodeError
+    if it is not TOML, and ConfigError if it does not validate.
+    """
+    st = toml_path.stat()
+    path_key = (str(toml_path.resolve()), config_type)
+    cached = _STAT_CACHE.get(path_key)
+    conf: ConfigType
+    if cached is not None and cached[:2] == (st.st_size, st.st_mtime_ns):
+        conf = _DIGEST_CACHE[(cached[2], config_type)]
+        return conf
+    content = toml_path.read_bytes()
+    digest = hashlib.sha256(content).hexdigest()
+    if (digest, config_type) in _DIGEST_CACHE:
+        conf = _DIGEST_CACHE[(digest, config_type)]
+    else:
+        conf = parse_config(toml.loads(content.decode("utf-8")), config_type)
+        _DIGEST_CACHE[(digest, config_type)] = conf
+    _STAT_CACHE[path_key] = (st.st_size, st.st_mtime_ns, digest)
+    return conf
@@ -0,0 +1,409 @@
+"""Batched straight-line fits of Arrhenius data."""
+# standard library imports
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from typing import NamedTuple
+
+import numpy as np
+from loguru import logger
+
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from numpy.typing import NDArray
+
+
+# global constants
+MAX_ITERATIONS = 100
+SLOPE_TOLERANCE = 1e-12
+HUBER_K = 1.345  # in robust standard deviations, 95% Gaussian efficiency
+OUTLIER_CUT = 2.5  # in robust standard deviations
+MAD_TO_SIGMA = 0.6745
+MAX_PAIRS = 200_000  # per column, for Theil-Sen
+MAX_PAIR_SLOPES = 1_000_000  # pairs times columns held at once
+RANSAC_TRIALS = 200
+RANDOM_SEED = 1
+
+
+class ArrheniusArrays(NamedTuple):
+    """Points of many rate columns, one column per rate, NaN if missing."""
+
+    x: NDArray[np.float64]  # 1000/T, kK^-1
+    y: NDArray[np.float64]  # log10(rate)
+    sx: NDArray[np.float64]  # uncertainty of x
+    sy: NDArray[np.float64]  # uncertainty of y
+
+
+class LineFits(NamedTuple):
+    """Fit parameters of many lines y = intercept + slope * x."""
+
+    intercept: NDArray[np.float64]
+    slope: NDArray[np.float64]
+    intercept_std: NDArray[np.float64]
+    slope_std: NDArray[np.float64]
+    covariance: NDArray[np.float64]  # of intercept and slope
+    residual_var: NDArray[np.float64]  # of a new point about the line
+    n_points: NDArray[np.int_]
+    chi2: NDArray[np.float64]
+    outliers: NDArray[np.bool_]  # True where a point was down-weighted
+
+
+def t_uncertainty_col(df: pd.DataFrame, rate_col: str) -> str:
+    """Return the most specific temperature-uncertainty column for a rate."""
+    per_rate_col = f"±T.{rate_col}"
+    if per_rate_col in df.columns:
+        return per_rate_col
+    return "±T"
+
+
+def arrhenius_arrays(
+    df: pd.DataFrame, rate_cols: list[str]
+) -> ArrheniusArrays:
+    """Convert rates and uncertainties to log-rate vs. inverse temperature."""
+    temps = df.index.to_numpy(dtype=float)[:, np.newaxis]
+    rates = df[rate_cols].to_numpy(dtype=float)
+    rate_uncerts = df[["±" + c for c in rate_cols]].to_numpy(dtype=float)
+    t_uncerts = df[[t_uncertainty_col(df, c) for c in rate_cols]].to_numpy(
+        dtype=float
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = np.broadcast_to(1000.0 / temps, rates.shape).copy()
+        sx = 1000.0 * t_uncerts / temps**2
+        y = np.log10(rates)
+        sy = rate_uncerts / (rates * np.log(10.0))
+    invalid = ~(
+        np.isfinite(x) & np.isfinite(y) & np.isfinite(sx) & np.isfinite(sy)
+    )
+    for arr in (x, y, sx, sy):
+        arr[invalid] = np.nan
+    return ArrheniusArrays(x, y, np.abs(sx), np.abs(sy))
+
+
+def york_fit(points: ArrheniusArrays) -> LineFits:
+    """Fit lines with errors in both variables, all columns at once.
+
+    This is York's iteration (York et al., Am. J. Phys. 72:367, 2004)
+    for uncorrelated errors, which gives the maximum-likelihood weighted
+    orthogonal-distance line.  Missing points carry zero weight.  As in
+    ODRPACK, parameter uncertainties are scaled by the reduced chi-square.
+    """
+    valid = ~np.isnan(points.y)
+    x = np.where(valid, points.x, 0.0)
+    y = np.where(valid, points.y, 0.0)
+    var_x = np.where(valid, points.sx**2, 0.0)
+    var_y = np.where(valid, points.sy**2, 0.0)
+    n_points = valid.sum(axis=0)
+    # Points with no stated uncertainty in either variable get equal
+    # unit weights so that the fit degrades to ordinary least squares.
+    no_errors = valid & (var_x + var_y == 0.0)
+    var_y = np.where(no_errors, 1.0, var_y)
+    slope = _weighted_slope(x, y, valid.astype(float))
+    for _ in range(MAX_ITERATIONS):
+        weights = _york_weights(valid, var_x, var_y, slope)
+        sum_w = weights.sum(axis=0)
+        x_bar = (weights * x).sum(axis=0) / sum_w
+        y_bar = (weights * y).sum(axis=0) / sum_w
+        u = np.where(valid, x - x_bar, 0.0)
+        v = np.where(valid, y - y_bar, 0.0)
+        beta = weights * (u * var_y + slope * v * var_x)
+        new_slope = (weights * beta * v).sum(axis=0) / (
+            weights * beta * u
+        ).sum(axis=0)
+        converged = np.abs(new_slope - slope) <= SLOPE_TOLERANCE * np.maximum(
+            np.abs(new_slope), 1.0
+        )
+        slope = new_slope
+        if np.all(converged | ~np.isfinite(slope)):
+            break
+    else:
+        logger.warning("errors-in-variables fit did not converge")
+    weights = _york_weights(valid, var_x, var_y, slope)
+    sum_w = weights.sum(axis=0)
+    x_bar = (weights * x).sum(axis=0) / sum_w
+    y_bar = (weights * y).sum(axis=0) / sum_w
+    intercept = y_bar - slope * x_bar
+    beta = weights * (
+        (x - x_bar) * var_y + slope * (y - y_bar) * var_x
+    )
+    x_adj = np.where(valid, x_bar + beta, 0.0)
+    x_adj_bar = (weights * x_adj).sum(axis=0) / sum_w
+    u_adj = np.where(valid, x_adj - x_adj_bar, 0.0)
+    slope_var = 1.0 / (weights * u_adj**2).sum(axis=0)
+    intercept_var = 1.0 / sum_w + x_adj_bar**2 * slope_var
+    residuals = np.where(valid, y - intercept - slope * x, 0.0)
+    chi2 = (weights * residuals**2).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.where(n_points > 2, chi2 / (n_points - 2), np.nan)
+    return LineFits(
+        intercept=intercept,
+        slope=slope,
+        intercept_std=np.sqrt(intercept_var * scale),
+        slope_std=np.sqrt(slope_var * scale),
+        covariance=-x_adj_bar * slope_var * scale,
+        residual_var=scale * n_points / sum_w,
+        n_points=n_points,
+        chi2=chi2,
+        outliers=np.zeros_like(valid),
+    )
+
+
+def _york_weights(
+    valid: NDArray[np.bool_],
+    var_x: NDArray[np.float64],
+    var_y: NDArray[np.float64],
+    slope: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    """Return York weights, zero for missing points."""
+    return np.divide(
+        1.0,
+        var_y + slope**2 * var_x,
+        out=np.zeros_like(var_y),
+        where=valid,
+    )
+
+
+def _weighted_slope(
+    x: NDArray[np.float64],
+    y: NDArray[np.float64],
+    weights: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    """Return weighted least-squares slopes of each column."""
+    sum_w = weights.sum(axis=0)
+    x_bar = (weights * x).sum(axis=0) / sum_w
+    y_bar = (weights * y).sum(axis=0) / sum_w
+    u = weights * (x - x_bar)
+    slope: NDArray[np.float64] = (u * (y - y_bar)).sum(axis=0) / (
+        u * (x - x_bar)
+    ).sum(axis=0)
+    return slope
+
+
+def ols_fit(points: ArrheniusArrays) -> LineFits:
+    """Fit lines by ordinary least squares, all columns at once."""
+    valid = ~np.isnan(points.y)
+    return _wls_fit(points, valid.astype(float), np.zeros_like(valid))
+
+
+def huber_fit(points: ArrheniusArrays) -> LineFits:
+    """Fit lines by Huber M-estimation, all columns at once.
+
+    Iteratively reweighted least squares, with the residual scale
+    re-estimated from the median absolute deviation at each step.
+    Points down-weighted beyond OUTLIER_CUT robust standard deviations
+    are flagged as outliers.
+    """
+    valid = ~np.isnan(points.y)
+    x = np.where(valid, points.x, 0.0)
+    y = np.where(valid, points.y, 0.0)
+    weights = valid.astype(float)
+    intercept, slope = _weighted_line(x, y, weights)
+    for _ in range(MAX_ITERATIONS):
+        residuals = np.where(valid, y - intercept - slope * x, np.nan)
+        scaled = np.abs(residuals) / _mad_scale(residuals)
+        weights = np.where(
+            valid,
+            np.minimum(
+                1.0, HUBER_K / np.where(scaled > 0.0, scaled, HUBER_K)
+            ),
+            0.0,
+        )
+        new_intercept, new_slope = _weighted_line(x, y, weights)
+        converged = np.abs(new_slope - slope) <= SLOPE_TOLERANCE * np.maximum(
+            np.abs(new_slope), 1.0
+        )
+        intercept, slope = new_intercept, new_slope
+        if np.all(converged | ~np.isfinite(slope)):
+            break
+    else:
+        logger.warning("Huber fit did not converge")
+    # Points beyond the outlier cut carry weights below this bound.
+    outliers = valid & (weights < HUBER_K / OUTLIER_CUT)
+    return _wls_fit(points, weights, outliers)
+
+
+def theil_sen_fit(points: ArrheniusArrays) -> LineFits:
+    """Fit lines by the Theil-Sen median of pairwise slopes.
+
+    Pairs are subsampled at random above MAX_PAIRS, and their slopes
+    are taken in blocks of columns holding at most MAX_PAIR_SLOPES
+    values.  Points with residuals beyond OUTLIER_CUT robust standard
+    deviations are counted as outliers and the parameter uncertainties
+    come from an ordinary least-squares fit of the remaining points.
+    """
+    valid = ~np.isnan(points.y)
+    n_rows, n_cols = points.y.shape
+    if n_rows * (n_rows - 1) // 2 <= MAX_PAIRS:
+        first, second = np.triu_indices(n_rows, k=1)
+    else:
+        # Draw pairs directly so that memory never grows as n_rows**2.
+        rng = np.random.default_rng(RANDOM_SEED)
+        first, second = rng.integers(0, n_rows, size=(2, MAX_PAIRS))
+        distinct = first != second
+        first, second = first[distinct], second[distinct]
+    block = max(1, MAX_PAIR_SLOPES // max(len(first), 1))
+    slope = np.empty(n_cols)
+    for start in range(0, n_cols, block):
+        cols = slice(start, start + block)
+        dx = points.x[second, cols] - points.x[first, cols]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pair_slopes = (points.y[second, cols] - points.y[first, cols]) / dx
+        pair_slopes[~np.isfinite(pair_slopes)] = np.nan
+        slope[cols] = _nanmedian(pair_slopes)
+    offsets = np.where(valid, points.y - slope * points.x, np.nan)
+    intercept = _nanmedian(offsets)
+    residuals = offsets - intercept
+    outliers = valid & (
+        np.abs(residuals) > OUTLIER_CUT * _mad_scale(residuals)
+    )
+    inlier_fits = _wls_fit(
+        points, (valid & ~outliers).astype(float), outliers
+    )
+    return inlier_fits._replace(intercept=intercept, slope=slope)
+
+
+def ransac_fit(points: ArrheniusArrays) -> LineFits:
+    """Fit lines by random sample consensus, all columns at once.
+
+    Each trial draws a random pair of points in every column.  The line
+    through the pair with the most points within OUTLIER_CUT robust
+    standard deviations of the OLS residuals wins, and the final line is
+    an ordinary least-squares fit to its inliers.
+    """
+    valid = ~np.isnan(points.y)
+    n_valid = valid.sum(axis=0)
+    n_cols = points.y.shape[1]
+    cols = np.arange(n_cols)
+    ols = ols_fit(points)
+    ols_residuals = points.y - ols.intercept - ols.slope * points.x
+    threshold = OUTLIER_CUT * _mad_scale(ols_residuals)
+    # Rows of valid points come first in each column of this ordering.
+    order = np.argsort(~valid, axis=0, kind="stable")
+    rng = np.random.default_rng(RANDOM_SEED)
+    best_count = np.full(n_cols, -1)
+    best_sse = np.full(n_cols, np.inf)
+    best_inliers = valid.copy()
+    for _ in range(RANSAC_TRIALS):
+        # Draw two distinct ranks among the valid points of each column.
+        k1 = np.floor(rng.random(n_cols) * n_valid).astype(int)
+        skip = np.floor(rng.random(n_cols) * (n_valid - 1)).astype(int)
+        k2 = (k1 + 1 + skip) % np.maximum(n_valid, 1)
+        i1 = order[np.minimum(k1, len(order) - 1), cols]
+        i2 = order[np.minimum(k2, len(order) - 1), cols]
+        x1, y1 = points.x[i1, cols], points.y[i1, cols]
+        x2, y2 = points.x[i2, cols], points.y[i2, cols]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = (y2 - y1) / (x2 - x1)
+        intercept = y1 - slope * x1
+        residuals = np.abs(points.y - intercept - slope * points.x)
+        inliers = valid & (residuals <= threshold)
+        count = inliers.sum(axis=0)
+        sse = np.where(inliers, residuals**2, 0.0).sum(axis=0)
+        better = np.isfinite(slope) & (
+            (count > best_count) | ((count == best_count) & (sse < best_sse))
+        )
+        best_count = np.where(better, count, best_count)
+        best_sse = np.where(better, sse, best_sse)
+        best_inliers[:, better] = inliers[:, better]
+    # Columns too short for any useful trial keep all their points.
+    best_inliers[:, n_valid < 3] = valid[:, n_valid < 3]
+    return _wls_fit(
+        points, best_inliers.astype(float), valid & ~best_inliers
+    )
+
+
+FITTERS = {
+    "ols": ols_fit,
+    "huber": huber_fit,
+    "theil-sen": theil_sen_fit,
+    "ransac": ransac_fit,
+}
+
+
+def fit_columns(points: ArrheniusArrays, methods: list[str]) -> LineFits:
+    """Fit each column with its own method, batching columns by method."""
+    n_cols = points.y.shape[1]
+    results = {
+        "intercept": np.full(n_cols, np.nan),
+        "slope": np.full(n_cols, np.nan),
+        "intercept_std": np.full(n_cols, np.nan),
+        "slope_std": np.full(n_cols, np.nan),
+        "covariance": np.full(n_cols, np.nan),
+        "residual_var": np.full(n_cols, np.nan),
+        "n_points": np.zeros(n_cols, dtype=int),
+        "chi2": np.full(n_cols, np.nan),
+        "outliers": np.zeros(points.y.shape, dtype=bool),
+    }
+    for method in dict.fromkeys(methods):
+        idx = [i for i, m in enumerate(methods) if m == method]
+        subset = ArrheniusArrays(*(arr[:, idx] for arr in points))
+        fits = FITTERS[method](subset)
+        for field, values in fits._asdict().items():
+            if field == "outliers":
+                results[field][:, idx] = values
+            else:
+                results[field][idx] = values
+    return LineFits(**results)
+
+
+def _weighted_line(
+    x: NDArray[np.float64],
+    y: NDArray[np.float64],
+    weights: NDArray[np.float64],
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Return weighted least-squares intercepts and slopes of columns."""
+    sum_w = weights.sum(axis=0)
+    x_bar = (weights * x).sum(axis=0) / sum_w
+    y_bar = (weights * y).sum(axis=0) / sum_w
+    slope = _weighted_slope(x, y, weights)
+    return y_bar - slope * x_bar, slope
+
+
+def _wls_fit(
+    points: ArrheniusArrays,
+    weights: NDArray[np.float64],
+    outliers: NDArray[np.bool_],
+) -> LineFits:
+    """Fit lines by weighted least squares with residual-based errors."""
+    valid = weights > 0.0
+    x = np.where(valid, points.x, 0.0)
+    y = np.where(valid, points.y, 0.0)
+    weights = np.where(valid, weights, 0.0)
+    n_points = valid.sum(axis=0)
+    sum_w = weights.sum(axis=0)
+    x_bar = (weights * x).sum(axis=0) / sum_w
+    intercept, slope = _weighted_line(x, y, weights)
+    sxx = (weights * np.where(valid, x - x_bar, 0.0) ** 2).sum(axis=0)
+    residuals = np.where(valid, y - intercept - slope * x, 0.0)
+    wrss = (weights * residuals**2).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma2 = np.where(
+            n_points > 2, wrss / sum_w * n_points / (n_points - 2), np.nan
+        )
+    slope_var = sigma2 / sxx * sum_w / n_points
+    intercept_var = sigma2 / n_points + x_bar**2 * slope_var
+    return LineFits(
+        intercept=intercept,
+        slope=slope,
+        intercept_std=np.sqrt(intercept_var),
+        slope_std=np.sqrt(slope_var),
+        covariance=-x_bar * slope_var,
+        residual_var=sigma2,
+        n_points=n_points,
+        chi2=wrss,
+        outliers=outliers,
+    )
+
+
+def _nanmedian(values: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Return column medians, NaN for columns without values."""
+    with np.errstate(all="ignore"):
+        empty = np.all(np.isnan(values), axis=0)
+        filled = np.where(empty, 0.0, values)
+        return np.where(empty, np.nan, np.nanmedian(filled, axis=0))
+
+
+def _mad_scale(residuals: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Return robust standard deviations of columns with NaN gaps."""
+    centered = residuals - _nanmedian(residuals)
+    return _nanmedian(np.abs(centered)) / MAD_TO_SIGMA
@@ -0,0 +1,81 @@
+"""Combine, fit, and plot in a single process."""
+# standard library imports
+import sys
+import threading
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+import typer
+from loguru import logger
+
+from .cache import save_fits
+from .combine import combine_inputs
+from .combine import write_combined
+from .common import APP
+from .common import STATS
+from .common import read_conf_file
+from .config import RunConfig
+from .plot import SHOW_OPTION
+from .plot import make_plot
+
+
+# global constants
+WRITE_OPTION = typer.Option(True, help="Write combined table to disk.")
+
+
+class _BackgroundWriter(threading.Thread):
+    """Write the combined table while later stages run."""
+
+    def __init__(
+        self,
+        combined: pd.DataFrame,
+        output_file: str,
+        sig_figs: Optional[int] = None,
+    ) -> None:
+        """Save arguments for the write."""
+        super().__init__(name="combined-writer")
+        self.combined = combined
+        self.output_file = output_file
+        self.sig_figs = sig_figs
+        self.error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        """Write the table, keeping any exception for the main thread."""
+        try:
+            write_combined(
+                self.combined, self.output_file, sig_figs=self.sig_figs
+            )
+        except Exception as e:  # noqa: BLE001
+            self.error = e
+
+
+@APP.command()
+@STATS.auto_save_and_report
+def run(
+    toml_file: Path,
+    show: bool = SHOW_OPTION,
+    write: bool = WRITE_OPTION,
+) -> None:
+    """Combine, fit, and plot in one step."""
+    conf = read_conf_file(toml_file, "configuration file", RunConfig)
+    combined = combine_inputs(conf)
+    writer = None
+    if write:
+        writer = _BackgroundWriter(
+            combined,
+            conf.combined.filename,
+            sig_figs=conf.combined.significant_figures,
+        )
+        writer.start()
+    fits = make_plot(conf, combined, show=show)
+    if writer is not None:
+        writer.join()
+        if writer.error is not None:
+            logger.error(f'unable to write "{writer.output_file}"')
+            logger.error(writer.error)
+            sys.exit(1)
+        # Fits are tied to the table on disk, so save them after it, but
+        # not when that table holds rounded values they were not fit on.
+        if conf.combined.significant_figures is None:
+            save_fits(Path(conf.combined.filename), conf.combined.rates, fits)
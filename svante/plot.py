@@ -1,6 +1,14 @@
 """Make Arrhenius plot with fits."""
 # standard library imports
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
+from typing import Any
+from typing import NamedTuple
+from typing import Optional
+from typing import Union
 
 import matplotlib.pyplot as plt  # type: ignore
 import numpy as np
@@ -8,13 +16,31 @@ import pandas as pd
 import pydove as dv  # type: ignore
 import typer
 from loguru import logger
-from scipy.constants import gas_constant  # type: ignore
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # type: ignore
+from matplotlib.colors import to_rgba  # type: ignore
+from matplotlib.figure import Figure  # type: ignore
+from numpy.typing import NDArray
 from statsdict import Stat
 
+from .cache import load_combined
+from .cache import save_fits
 from .common import APP
+from .common import CACHE_OPTION
+from .common import INVERSE_T_COL
+from .common import LOG10_TO_E
 from .common import STATE
 from .common import STATS
+from .common import R
 from .common import read_conf_file
+from .config import PlotConfig
+from .config import PlotSpec
+from .config import RunConfig
+from .config import SaveFigSpec
+from .fit import ArrheniusArrays
+from .fit import LineFits
+from .fit import arrhenius_arrays
+from .fit import fit_columns
+from .fit import york_fit
 
 
 # from uncertainties import unumpy  # type: ignore
@@ -23,11 +49,9 @@ from .common import read_conf_file
 # global constants
 EPSILON = 0.001  # close to zero for T inversion
 ZERO_C = 273.15  # in K
-R = gas_constant / 1000.0  # kJ/mol⋅K
-LOG10_TO_E = 2.303
-INVERSE_T_COL = "1000/T"
 SHOW_OPTION = typer.Option(False, help="Show plot.")
 PLOT_STYLE = "default"
+OUTLIER_COLOR = "red"
 
 
 def inverse_kilokelvin_to_c(inverse_kilo_kelvins: float) -> float:
@@ -45,78 +69,81 @@ def c_to_inverse_kilokelvin(c: float) -> float:
 def plot(
     toml_file: Path,
     show: bool = SHOW_OPTION,
+    cache: bool = CACHE_OPTION,
 ) -> None:
     """Arrhenius plot with fits."""
-    conf = read_conf_file(toml_file, "configuration file", "plot")
-    combined = conf["combined"]
-    plot_params = conf["plot"]
-    df = pd.read_csv(combined["filename"], sep="\t", index_col=0)
+    conf = read_conf_file(toml_file, "configuration file", PlotConfig)
+    table_path = Path(conf.combined.filename)
+    df = load_combined(table_path, use_cache=cache)
+    fits = make_plot(conf, df, show=show)
+    save_fits(table_path, conf.combined.rates, fits)
+
+
+def make_plot(
+    conf: Union[PlotConfig, RunConfig], df: pd.DataFrame, show: bool = False
+) -> LineFits:
+    """Fit and plot a combined table held in memory, returning fits."""
+    combined = conf.combined
+    plot_params = conf.plot
+    df = df.copy(deep=False)  # new columns must not leak to caller
+    if INVERSE_T_COL not in df.columns:
+        df[INVERSE_T_COL] = 1000.0 / df.index
     df["Temperature"] = df.index
-    df[INVERSE_T_COL] = 1000.0 / df["Temperature"]
+    rate_cols = [r.name for r in combined.rates]
+    methods = [r.fit for r in combined.rates]
+    points = arrhenius_arrays(df, rate_cols)
+    fits = fit_columns(points, methods)
+    odr = york_fit(points)
+    report_fits(rate_cols, methods, fits, odr)
+    if plot_params.layout == "grid":
+        plot_grid(plot_params, make_panels(conf, df, points, fits), show=show)
+        return fits
 
     # make fits and plots
     with plt.style.context(PLOT_STYLE):
         unused_fig, ax = plt.subplots()
         res = {}
-        for rate_col_params in combined["rates"]:
-            col = rate_col_params["name"]
-            res[col] = dv.regplot(
-                df[INVERSE_T_COL],
-                np.log10(df[col]),
-                ax=ax,
-                label=rate_col_params["label"],
-            )
+        for i, rate_col_params in enumerate(combined.rates):
+            col = rate_col_params.name
+            if methods[i] == "ols":
+                res[col] = dv.regplot(
+                    df[INVERSE_T_COL],
+                    np.log10(df[col]),
+                    ax=ax,
+                    label=rate_col_params.label,
+                )
+            else:
+                plot_robust_fit(ax, points, fits, i, rate_col_params.label)
         handles, labels = ax.get_legend_handles_labels()
         ax.set_xlabel(r"$1/T$, kK$^{-1}$")
         ax.set_ylabel(
-            r"$\log ($" + rf"{plot_params['y_label']}" + r"/s$^{-1})$"
+            r"$\log ($" + rf"{plot_params.y_label}" + r"/s$^{-1})$"
         )
         ax.legend(handles, labels)
         secax = ax.secondary_xaxis(
             "top", functions=(inverse_kilokelvin_to_c, c_to_inverse_kilokelvin)
         )
         secax.set_xlabel(r"$T, ^{\circ}$C")
-        # Now calculate parameters from the fits
-        for rate_col in combined["rates"]:
-            col = rate_col["name"]
-            log_preexp = float(res[col].params[0])
-            log_preexp_std = float(res[col].bse[0])
-            delta_h = float(res[col].params[1] * R * -1000.0 * LOG10_TO_E)
-            delta_h_std = float(res[col].bse[1] * R * 1000.0 * LOG10_TO_E)
-            STATS[f"ΔH({col})"] = Stat(
-                delta_h,
-                uncert=delta_h_std,
-                units="kJ/mol",
-                desc="activation enthalpy",
-            )
-            STATS[f"log A({col})"] = Stat(
-                log_preexp,
-                uncert=log_preexp_std,
-                units="1/s",
-                desc="Pre-exponential",
-            )
-            if STATE["verbose"]:
+        # Now annotate the fits
+        for i, rate_col in enumerate(combined.rates):
+            col = rate_col.name
+            if STATE["verbose"] and col in res:
                 print(res[col].summary())
-            label = (
-                rf"$\Delta H^\ddag = {delta_h:.0f}$  kJ/mol, "
-                + r"$A=10^{"
-                + f"{log_preexp:.0f}"
-                + r"}s^{-1}$ "
-            )
+            label = fit_label(fits, i)
             ax.annotate(
                 label,
-                xy=rate_col["line_label_loc"],
-                rotation=np.degrees(np.arctan2(res[col].params[1], 1.0)),
+                xy=rate_col.line_label_loc,
+                rotation=np.degrees(np.arctan2(fits.slope[i], 1.0)),
                 rotation_mode="anchor",
                 transform_rotates_text=True,
             )
         # Do ratio plots
-        if len(plot_params["ratios"]) > 0:
+        if len(plot_params.ratios) > 0:
             ax2 = ax.twinx()
-            for ratio in plot_params["ratios"]:
-                num_col = ratio["numerator"]
-                denom_col = ratio["denominator"]
-                ratio_col = ratio["name"]
+            for ratio in plot_params.ratios:
+                num_col = ratio.numerator
+                denom_col = ratio.denominator
+                ratio_col = ratio.name
                 df[ratio_col] = df[num_col] / df[denom_col]
                 # uratio_name = "+" + ratio_name
                 # t_uncert_ratio_col = f"±T.{ratio_name}"
@@ -140,18 +167,265 @@ def plot(
             handles += ratio_handle
             labels.append("Ratio")
         ax.legend(handles, labels)
-        sv_params = plot_params["savefig"]
-        fig_format = sv_params["format"]
-        fname = f'{sv_params["filename"]}.{fig_format}'
-        logger.debug(f'saving {fig_format} figure to "{fname}"')
-        plt.savefig(
-            fname,
-            dpi=sv_params["dpi"],
-            facecolor=sv_params["facecolor"],
-            edgecolor=sv_params["edgecolor"],
-            format=fig_format,
-            transparent=sv_params["transparent"],
-            pad_inches=sv_params["pad_inches"],
-        )
+        save_figure(plot_params.savefig)
         if show:
             plt.show()
+    return fits
+
+
+def report_fits(
+    rate_cols: list[str], methods: list[str], fits: LineFits, odr: LineFits
+) -> None:
+    """Save activation parameters of fits as stats."""
+    for i, col in enumerate(rate_cols):
+        fit_desc = "" if methods[i] == "ols" else f", {methods[i]} fit"
+        STATS[f"ΔH({col})"] = Stat(
+            float(fits.slope[i] * R * -1000.0 * LOG10_TO_E),
+            uncert=float(fits.slope_std[i] * R * 1000.0 * LOG10_TO_E),
+            units="kJ/mol",
+            desc="activation enthalpy" + fit_desc,
+        )
+        STATS[f"log A({col})"] = Stat(
+            float(fits.intercept[i]),
+            uncert=float(fits.intercept_std[i]),
+            units="1/s",
+            desc="Pre-exponential" + fit_desc,
+        )
+        if methods[i] != "ols":
+            STATS[f"n_outliers({col})"] = Stat(
+                int(fits.outliers[:, i].sum()),
+                desc=f"points down-weighted by {methods[i]} fit",
+            )
+        STATS[f"ΔH_ODR({col})"] = Stat(
+            float(odr.slope[i] * R * -1000.0 * LOG10_TO_E),
+            uncert=float(odr.slope_std[i] * R * 1000.0 * LOG10_TO_E),
+            units="kJ/mol",
+            desc="activation enthalpy, errors in T and rate",
+        )
+        STATS[f"log A_ODR({col})"] = Stat(
+            float(odr.intercept[i]),
+            uncert=float(odr.intercept_std[i]),
+            units="1/s",
+            desc="Pre-exponential, errors in T and rate",
+        )
+
+
+def plot_robust_fit(
+    ax: Any, points: ArrheniusArrays, fits: LineFits, i: int, label: str
+) -> None:
+    """Plot points and robust fit line of one rate, marking outliers."""
+    valid = ~np.isnan(points.y[:, i])
+    x = points.x[valid, i]
+    y = points.y[valid, i]
+    outliers = fits.outliers[valid, i]
+    (point_line,) = ax.plot(x, y, "o", label=label)
+    x_ends = np.array([x.min(), x.max()])
+    ax.plot(
+        x_ends,
+        fits.intercept[i] + fits.slope[i] * x_ends,
+        color=point_line.get_color(),
+    )
+    ax.plot(
+        x[outliers],
+        y[outliers],
+        "x",
+        color=OUTLIER_COLOR,
+        markersize=10,
+        label="_nolegend_",
+    )
+
+
+def fit_label(fits: LineFits, i: int) -> str:
+    """Return annotation of activation parameters for a fit."""
+    delta_h = float(fits.slope[i] * R * -1000.0 * LOG10_TO_E)
+    log_preexp = float(fits.intercept[i])
+    return (
+        rf"$\Delta H^\ddag = {delta_h:.0f}$  kJ/mol, "
+        + r"$A=10^{"
+        + f"{log_preexp:.0f}"
+        + r"}s^{-1}$ "
+    )
+
+
+def save_figure(sv_params: SaveFigSpec, fig: Optional[Figure] = None) -> None:
+    """Save a figure, the current one by default, with configured options."""
+    fig_format = sv_params.format
+    fname = f"{sv_params.filename}.{fig_format}"
+    logger.debug(f'saving {fig_format} figure to "{fname}"')
+    savefig = plt.savefig if fig is None else fig.savefig
+    savefig(
+        fname,
+        dpi=sv_params.dpi,
+        facecolor=sv_params.facecolor,
+        edgecolor=sv_params.edgecolor,
+        format=fig_format,
+        transparent=sv_params.transparent,
+        pad_inches=sv_params.pad_inches,
+    )
+
+
+class Panel(NamedTuple):
+    """Data and fit line of one small-multiples panel."""
+
+    title: str
+    y_label: str
+    x: NDArray[np.float64]
+    y: NDArray[np.float64]
+    fit: Optional[tuple[float, float]]  # intercept, slope
+    annotation: str
+    color: Optional[str]
+    outliers: NDArray[np.bool_]  # True where point was down-weighted in fit
+
+
+def make_panels(
+    conf: Union[PlotConfig, RunConfig],
+    df: pd.DataFrame,
+    points: ArrheniusArrays,
+    fits: LineFits,
+) -> list[Panel]:
+    """Return one panel per rate and one per ratio."""
+    y_label = r"$\log ($" + rf"{conf.plot.y_label}" + r"/s$^{-1})$"
+    panels = []
+    for i, rate_col in enumerate(conf.combined.rates):
+        valid = ~np.isnan(points.y[:, i])
+        panels.append(
+            Panel(
+                title=rate_col.label,
+                y_label=y_label,
+                x=points.x[valid, i],
+                y=points.y[valid, i],
+                fit=(float(fits.intercept[i]), float(fits.slope[i])),
+                annotation=fit_label(fits, i),
+                color=None,
+                outliers=fits.outliers[valid, i],
+            )
+        )
+    for ratio in conf.plot.ratios:
+        ratio_vals = (
+            df[ratio.numerator] / df[ratio.denominator]
+        ).to_numpy(dtype=float)
+        valid = np.isfinite(ratio_vals)
+        panels.append(
+            Panel(
+                title=ratio.name,
+                y_label="KIE Ratio",
+                x=df[INVERSE_T_COL].to_numpy(dtype=float)[valid],
+                y=ratio_vals[valid],
+                fit=None,
+                annotation="",
+                color="green",
+                outliers=np.zeros(int(valid.sum()), dtype=bool),
+            )
+        )
+    return panels
+
+
+def draw_panel(ax: Any, panel: Panel) -> None:
+    """Draw one panel with secondary Celsius axis and fit annotation."""
+    if panel.fit is None:
+        ax.plot(panel.x, panel.y, color=panel.color)
+    else:
+        ax.plot(panel.x, panel.y, "o", color=panel.color)
+        intercept, slope = panel.fit
+        x_ends = np.array([panel.x.min(), panel.x.max()])
+        ax.plot(x_ends, intercept + slope * x_ends, color=panel.color)
+        ax.plot(
+            panel.x[panel.outliers],
+            panel.y[panel.outliers],
+            "x",
+            color=OUTLIER_COLOR,
+            markersize=10,
+        )
+        ax.annotate(
+            panel.annotation,
+            xy=(0.03, 0.05),
+            xycoords="axes fraction",
+            fontsize="small",
+        )
+    ax.set_title(panel.title)
+    ax.set_xlabel(r"$1/T$, kK$^{-1}$")
+    ax.set_ylabel(panel.y_label)
+    secax = ax.secondary_xaxis(
+        "top", functions=(inverse_kilokelvin_to_c, c_to_inverse_kilokelvin)
+    )
+    secax.set_xlabel(r"$T, ^{\circ}$C")
+
+
+def render_panel(
+    panel: Panel, figsize: tuple[float, float], dpi: int, facecolor: str
+) -> NDArray[np.uint8]:
+    """Render one panel to an RGBA image, for use in worker processes."""
+    with plt.style.context(PLOT_STYLE):
+        fig = Figure(figsize=figsize, dpi=dpi, facecolor=facecolor)
+        canvas: Any = FigureCanvasAgg(fig)
+        draw_panel(fig.add_subplot(), panel)
+        fig.tight_layout()
+        canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).copy()
+
+
+def plot_grid(
+    plot_params: PlotSpec, panels: list[Panel], show: bool = False
+) -> None:
+    """Plot panels as small multiples, rendering large grids in parallel."""
+    grid_params = plot_params.grid
+    sv_params = plot_params.savefig
+    n_panels = len(panels)
+    n_cols = min(grid_params.columns, n_panels)
+    n_rows = -(-n_panels // n_cols)
+    figsize = grid_params.panel_size
+    workers = grid_params.workers or os.cpu_count() or 1
+    threshold = grid_params.parallel_threshold
+    if show or workers < 2 or n_panels < threshold:
+        with plt.style.context(PLOT_STYLE):
+            fig, axes = plt.subplots(
+                n_rows,
+                n_cols,
+                figsize=(figsize[0] * n_cols, figsize[1] * n_rows),
+                squeeze=False,
+            )
+            for ax, panel in zip(axes.flat, panels):
+                draw_panel(ax, panel)
+            for ax in axes.flat[n_panels:]:
+                ax.set_axis_off()
+            fig.tight_layout()
+            save_figure(sv_params)
+            if show:
+                plt.show()
+        return
+    logger.debug(f"rendering {n_panels} panels with {workers} workers")
+    facecolor = "none" if sv_params.transparent else sv_params.facecolor
+    renderer = partial(
+        render_panel,
+        figsize=figsize,
+        dpi=sv_params.dpi,
+        facecolor=facecolor,
+    )
+    # Spawned workers are safe to start while other threads run, such as
+    # the background table writer of svante run.
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        tiles = list(
+            executor.map(
+                renderer, panels, chunksize=max(1, n_panels // workers)
+            )
+        )
+    tile_h, tile_w = tiles[0].shape[:2]
+    image = np.empty((n_rows * tile_h, n_cols * tile_w, 4), dtype=np.uint8)
+    image[:] = np.round(np.array(to_rgba(facecolor)) * 255).astype(np.uint8)
+    for k, tile in enumerate(tiles):
+        row, col = divmod(k, n_cols)
+        image[
+            row * tile_h : (row + 1) * tile_h,
+            col * tile_w : (col + 1) * tile_w,
+        ] = tile
+    # Placing the composite pixel for pixel in a figure of the same size
+    # lets the savefig parameters apply as they do to serial grids.
+    height, width = image.shape[:2]
+    fig = Figure(
+        figsize=(width / sv_params.dpi, height / sv_params.dpi),
+        dpi=sv_params.dpi,
+    )
+    fig.figimage(image)
+    save_figure(sv_params, fig=fig)
@@ -0,0 +1,191 @@
+"""Predict rates with confidence bands on temperature grids."""
+# standard library imports
+import sys
+from collections.abc import Iterable
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa  # type: ignore
+import pyarrow.parquet as pq  # type: ignore
+import typer
+from loguru import logger
+from numpy.typing import NDArray
+from scipy import stats  # type: ignore
+from statsdict import Stat
+
+from .cache import load_combined
+from .cache import load_fits
+from .cache import save_fits
+from .common import APP
+from .common import CACHE_OPTION
+from .common import STATS
+from .common import read_conf_file
+from .config import PredictConfig
+from .fit import LineFits
+from .fit import arrhenius_arrays
+from .fit import fit_columns
+from .tsv import MAX_SIG_FIGS
+from .tsv import format_rows
+
+
+# global constants
+CHUNK_ROWS = 100_000
+PARQUET_SUFFIXES = (".parquet", ".pq")
+LEVEL_OPTION = typer.Option(
+    0.95, min=0.0, max=1.0, help="Confidence level of bands."
+)
+T_COL_OPTION = typer.Option(
+    None, help="Temperature column of grid file, first if omitted."
+)
+REFIT_OPTION = typer.Option(
+    False, help="Fit combined table even if saved fits are current."
+)
+SIG_FIGS_OPTION = typer.Option(
+    None,
+    min=1,
+    max=MAX_SIG_FIGS,
+    help="Significant figures of TSV output, lossless if omitted.",
+)
+
+
+@APP.command()
+@STATS.auto_save_and_report
+def predict(
+    toml_file: Path,
+    grid_file: Path,
+    output_file: Path,
+    level: float = LEVEL_OPTION,
+    t_col: Optional[str] = T_COL_OPTION,
+    refit: bool = REFIT_OPTION,
+    cache: bool = CACHE_OPTION,
+    sig_figs: Optional[int] = SIG_FIGS_OPTION,
+) -> None:
+    """Predict rates with confidence bands on a temperature grid."""
+    conf = read_conf_file(toml_file, "configuration file", PredictConfig)
+    table_path = Path(conf.combined.filename)
+    rates = conf.combined.rates
+    rate_cols = [r.name for r in rates]
+    fits = None if refit else load_fits(table_path, rates)
+    if fits is None:
+        logger.info(f'fitting "{table_path}"')
+        try:
+            df = load_combined(table_path, use_cache=cache)
+        except (OSError, ValueError) as e:
+            logger.error(f'unable to read combined table "{table_path}"')
+            logger.error(e)
+            sys.exit(1)
+        fits = fit_columns(
+            arrhenius_arrays(df, rate_cols), [r.fit for r in rates]
+        )
+        save_fits(table_path, rates, fits)
+    else:
+        logger.info(f'using saved fits of "{table_path}"')
+    try:
+        n_rows = write_predictions(
+            (
+                rate_bands(temps, rate_cols, fits, level)
+                for temps in read_grid(grid_file, t_col)
+            ),
+            output_file,
+            sig_figs=sig_figs,
+        )
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f'unable to predict on grid "{grid_file}"')
+        logger.error(e)
+        sys.exit(1)
+    logger.info(f'{n_rows} predictions written to "{output_file}"')
+    STATS["n_predicted"] = Stat(n_rows, desc="grid temperatures predicted")
+
+
+def rate_bands(
+    temps: NDArray[np.float64],
+    rate_cols: list[str],
+    fits: LineFits,
+    level: float,
+) -> pd.DataFrame:
+    """Evaluate rates and their confidence and prediction bands.
+
+    Lines are evaluated as log10(rate) vs. 1000/T with the covariance
+    of their parameters, and bands use Student's t with n - 2 degrees
+    of freedom.  Prediction bands add the residual variance of a new
+    point.  Columns of each rate are the rate, the lower and upper
+    confidence bands of the mean, and the lower and upper prediction
+    bands.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = (1000.0 / temps)[:, np.newaxis]
+        log_k = fits.intercept + fits.slope * x
+        mean_var = np.maximum(
+            fits.intercept_std**2
+            + 2.0 * x * fits.covariance
+            + x**2 * fits.slope_std**2,
+            0.0,
+        )
+        t_crit = stats.t.ppf(0.5 + level / 2.0, fits.n_points - 2)
+        ci = t_crit * np.sqrt(mean_var)
+        pi = t_crit * np.sqrt(mean_var + fits.residual_var)
+    columns = {}
+    for i, col in enumerate(rate_cols):
+        columns[col] = 10.0 ** log_k[:, i]
+        columns[f"{col}.ci_low"] = 10.0 ** (log_k[:, i] - ci[:, i])
+        columns[f"{col}.ci_high"] = 10.0 ** (log_k[:, i] + ci[:, i])
+        columns[f"{col}.pi_low"] = 10.0 ** (log_k[:, i] - pi[:, i])
+        columns[f"{col}.pi_high"] = 10.0 ** (log_k[:, i] + pi[:, i])
+    return pd.DataFrame(columns, index=pd.Index(temps, name="T"))
+
+
+def read_grid(
+    grid_path: Path,
+    t_col: Optional[str] = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Iterator[NDArray[np.float64]]:
+    """Yield chunks of temperatures from a TSV or Parquet grid file."""
+    if grid_path.suffix in PARQUET_SUFFIXES:
+        grid = pq.ParquetFile(grid_path)
+        col = grid.schema_arrow.names[0] if t_col is None else t_col
+        for batch in grid.iter_batches(batch_size=chunk_rows, columns=[col]):
+            yield batch.column(0).to_numpy(zero_copy_only=False).astype(
+                float
+            )
+        return
+    with pd.read_csv(
+        grid_path,
+        sep="\t",
+        usecols=[0 if t_col is None else t_col],
+        chunksize=chunk_rows,
+        float_precision="round_trip",
+    ) as reader:
+        for chunk in reader:
+            yield chunk.iloc[:, 0].to_numpy(dtype=float)
+
+
+def write_predictions(
+    frames: Iterable[pd.DataFrame],
+    output_path: Path,
+    sig_figs: Optional[int] = None,
+) -> int:
+    """Stream frames to a TSV or Parquet file, returning rows written."""
+    n_rows = 0
+    if output_path.suffix in PARQUET_SUFFIXES:
+        writer = None
+        try:
+            for df in frames:
+                table = pa.Table.from_pandas(df, preserve_index=True)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                writer.write_table(table)
+                n_rows += len(df)
+        finally:
+            if writer is not None:
+                writer.close()
+        return n_rows
+    with output_path.open("w", encoding="utf-8", newline="") as fh:
+        for df in frames:
+            if fh.tell() == 0:
+                fh.write("\t".join([str(df.index.name), *df.columns]) + "\n")
+            fh.write(format_rows(df, sig_figs))
+            n_rows += len(df)
+    return n_rows
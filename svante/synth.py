@@ -0,0 +1,253 @@
+"""Generate synthetic rate datasets and matching configurations."""
+# standard library imports
+import os
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import toml
+import typer
+from loguru import logger
+from numpy.typing import NDArray
+
+from .common import APP
+from .common import LOG10_TO_E
+from .common import R
+from .tsv import format_rows
+
+
+# global constants
+CHUNK_ROWS = 100_000
+GRID_LAYOUT_MIN_RATES = 5
+ISOTOPES = ("H", "D")
+
+
+class SynthKind(str, Enum):
+    """Kinds of synthetic temperature dependence."""
+
+    arrhenius = "arrhenius"
+    curved = "curved"
+    isotope = "isotope"
+
+
+KIND_OPTION = typer.Option(SynthKind.arrhenius, help="Kind of dataset.")
+PREFIX_OPTION = typer.Option("synth", help="Prefix of output filenames.")
+N_FILES_OPTION = typer.Option(2, min=1, help="Number of input files.")
+N_ROWS_OPTION = typer.Option(15, min=3, help="Temperatures per file.")
+N_COLS_OPTION = typer.Option(1, min=1, help="Rate columns per file.")
+DELTA_H_OPTION = typer.Option(50.0, help="Activation enthalpy, kJ/mol.")
+DELTA_H_STEP_OPTION = typer.Option(
+    5.0, help="Increase of ΔH for each successive rate, kJ/mol."
+)
+LOG_A_OPTION = typer.Option(13.0, help="log10 of pre-exponential, 1/s.")
+NOISE_OPTION = typer.Option(0.05, min=0.0, help="Noise in log10(rate).")
+T_MIN_OPTION = typer.Option(190.0, min=1.0, help="Minimum temperature, K.")
+T_MAX_OPTION = typer.Option(260.0, min=1.0, help="Maximum temperature, K.")
+T_UNCERTAINTY_OPTION = typer.Option(
+    0.3, min=0.0, help="Temperature uncertainty, K."
+)
+CURVATURE_OPTION = typer.Option(
+    0.5, help="Curvature of curved kind, log10(rate)/kK⁻²."
+)
+ISOTOPE_DELTA_H_OPTION = typer.Option(
+    5.0, help="Extra ΔH of heavy isotope, kJ/mol."
+)
+SEED_OPTION = typer.Option(1, help="Random-number seed.")
+WORKERS_OPTION = typer.Option(
+    os.cpu_count() or 1, min=1, help="Processes writing files."
+)
+
+
+def log_rates(
+    inverse_t: NDArray[np.float64],
+    delta_h: NDArray[np.float64],
+    log_a: float,
+    kind: SynthKind,
+    curvature: float,
+    inverse_t_mid: float,
+) -> NDArray[np.float64]:
+    """Return noiseless log10 rates at inverse temperatures in kK⁻¹."""
+    log_k: NDArray[np.float64] = log_a - delta_h * inverse_t / (
+        R * 1000.0 * LOG10_TO_E
+    )
+    if kind == SynthKind.curved:
+        log_k += curvature * (inverse_t - inverse_t_mid) ** 2
+    return log_k
+
+
+def write_dataset(
+    path: Path,
+    names: list[str],
+    delta_h: NDArray[np.float64],
+    seed: tuple[int, int],
+    kind: SynthKind,
+    n_rows: int,
+    log_a: float,
+    noise: float,
+    t_min: float,
+    t_max: float,
+    t_uncertainty: float,
+    curvature: float,
+) -> None:
+    """Generate one dataset in chunks of rows, streaming it to a TSV."""
+    rng = np.random.default_rng(seed)
+    inverse_t_mid = 500.0 / t_min + 500.0 / t_max
+    columns = []
+    for name in names:
+        columns += [name, "±" + name]
+    logger.info(f"writing {n_rows} rows of {len(names)} rates to {path}")
+    with path.open("w", encoding="utf-8") as fh:
+        fh.write("\t".join(["T", *columns]) + "\n")
+        for start in range(0, n_rows, CHUNK_ROWS):
+            stop = min(start + CHUNK_ROWS, n_rows)
+            temps = t_min + (t_max - t_min) * np.arange(start, stop) / (
+                n_rows - 1
+            )
+            # Rates follow the true temperatures, not the nominal ones.
+            true_temps = temps + rng.normal(
+                0.0, t_uncertainty, size=temps.shape
+            )
+            log_k = log_rates(
+                1000.0 / true_temps[:, np.newaxis],
+                delta_h,
+                log_a,
+                kind,
+                curvature,
+                inverse_t_mid,
+            ) + rng.normal(0.0, noise, size=(len(temps), len(names)))
+            k = 10.0**log_k
+            values = np.empty((len(temps), 2 * len(names)))
+            values[:, 0::2] = k
+            values[:, 1::2] = k * noise * np.log(10.0)
+            chunk = pd.DataFrame(
+                values, index=pd.Index(temps, name="T"), columns=columns
+            )
+            fh.write(format_rows(chunk))
+
+
+@APP.command()
+def synth(
+    output_dir: Path,
+    kind: SynthKind = KIND_OPTION,
+    prefix: str = PREFIX_OPTION,
+    n_files: int = N_FILES_OPTION,
+    n_rows: int = N_ROWS_OPTION,
+    n_cols: int = N_COLS_OPTION,
+    delta_h: float = DELTA_H_OPTION,
+    delta_h_step: float = DELTA_H_STEP_OPTION,
+    log_a: float = LOG_A_OPTION,
+    noise: float = NOISE_OPTION,
+    t_min: float = T_MIN_OPTION,
+    t_max: float = T_MAX_OPTION,
+    t_uncertainty: float = T_UNCERTAINTY_OPTION,
+    curvature: float = CURVATURE_OPTION,
+    isotope_delta_h: float = ISOTOPE_DELTA_H_OPTION,
+    seed: int = SEED_OPTION,
+    workers: int = WORKERS_OPTION,
+) -> None:
+    """Generate synthetic rate datasets and a TOML to combine them."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    isotopes = ISOTOPES if kind == SynthKind.isotope else ("",)
+    inverse_t_mid = 500.0 / t_min + 500.0 / t_max
+    inputs = []
+    rates = []
+    ratios = []
+    jobs = []
+    for i in range(n_files):
+        uri = f"{prefix}_{i}.tsv"
+        col_isotopes = [(j, iso) for j in range(n_cols) for iso in isotopes]
+        names = [f"k{j}{iso}" for j, iso in col_isotopes]
+        col_delta_h = np.array(
+            [
+                delta_h
+                + (i * n_cols + j) * delta_h_step
+                + (isotope_delta_h if iso == "D" else 0.0)
+                for j, iso in col_isotopes
+            ]
+        )
+        jobs.append(
+            partial(
+                write_dataset,
+                output_dir / uri,
+                names,
+                col_delta_h,
+                seed=(seed, i),
+                kind=kind,
+                n_rows=n_rows,
+                log_a=log_a,
+                noise=noise,
+                t_min=t_min,
+                t_max=t_max,
+                t_uncertainty=t_uncertainty,
+                curvature=curvature,
+            )
+        )
+        for j, name in enumerate(names):
+            rate_name = f"k_{i}_{name[1:]}"
+            inputs.append(
+                {
+                    "uri": uri,
+                    "T": {"col": 0, "uncertainty": t_uncertainty},
+                    "rate": {"name": name, "uncertainties": "±" + name},
+                }
+            )
+            label_log_k = log_rates(
+                np.array(inverse_t_mid),
+                col_delta_h[j],
+                log_a,
+                kind,
+                curvature,
+                inverse_t_mid,
+            )
+            rates.append(
+                {
+                    "name": rate_name,
+                    "label": rate_name.replace("_", " "),
+                    "line_label_loc": [inverse_t_mid, float(label_log_k)],
+                }
+            )
+            if col_isotopes[j][1] == "D":
+                light = rates[-2]["name"]
+                ratios.append(
+                    {
+                        "numerator": light,
+                        "denominator": rate_name,
+                        "name": f"{light}/{rate_name}",
+                        "title": f"{light}/{rate_name} ratio",
+                    }
+                )
+    with ProcessPoolExecutor(max_workers=min(workers, n_files)) as executor:
+        for future in [executor.submit(job) for job in jobs]:
+            future.result()
+    layout = "grid" if len(rates) >= GRID_LAYOUT_MIN_RATES else "single"
+    conf = {
+        "inputs": inputs,
+        "combined": {
+            "title": f"Synthetic {kind.value} rates",
+            "filename": f"{prefix}_combined.tsv",
+            "rates": rates,
+        },
+        "plot": {
+            "secondary_axis_units": "C",
+            "y_label": "k",
+            "add_fit_values": True,
+            "layout": layout,
+            "savefig": {
+                "filename": f"{prefix}_plot",
+                "format": "png",
+                "dpi": 100,
+                "facecolor": "w",
+                "edgecolor": "w",
+                "transparent": False,
+                "pad_inches": 0.1,
+            },
+            "ratios": ratios,
+        },
+    }
+    toml_path = output_dir / f"{prefix}.toml"
+    logger.info(f"configuration written to {toml_path}")
+    with toml_path.open("w", encoding="utf-8") as fh:
+        toml.dump(conf, fh)
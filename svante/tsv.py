@@ -0,0 +1,81 @@
+"""Lossless, vectorized writing of tab-separated tables."""
+# standard library imports
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from numpy.typing import NDArray
+
+
+# global constants
+CHUNK_ROWS = 100_000
+NA_REP = ""
+MAX_SIG_FIGS = 17  # enough to round-trip any float64
+
+
+def format_column(
+    values: NDArray[Any], sig_figs: int | None = None
+) -> list[str]:
+    """Format a column of values as strings.
+
+    Floats are written as the shortest string that reads back to the
+    same float64 unless a number of significant figures is given.
+    Missing values become empty strings.
+    """
+    formatted: list[str]
+    if values.dtype.kind == "f":
+        if sig_figs is None:
+            strings = values.astype(str)
+        else:
+            strings = np.char.mod(f"%.{sig_figs}g", values)
+        formatted = np.where(np.isnan(values), NA_REP, strings).tolist()
+    elif values.dtype.kind in "iub":
+        formatted = values.astype(str).tolist()
+    else:
+        formatted = [NA_REP if pd.isna(v) else str(v) for v in values]
+    return formatted
+
+
+def format_rows(
+    df: pd.DataFrame, sig_figs: int | None = None, index: bool = True
+) -> str:
+    """Return tab-separated lines of a frame, formatted by column.
+
+    Significant figures apply to data columns only, so that the index
+    of temperatures is always written losslessly.
+    """
+    columns = [
+        format_column(df[col].to_numpy(), sig_figs) for col in df.columns
+    ]
+    if index:
+        columns.insert(0, format_column(df.index.to_numpy()))
+    return "\n".join(map("\t".join, zip(*columns))) + "\n"
+
+
+def write_tsv(
+    df: pd.DataFrame,
+    path: Path,
+    sig_figs: int | None = None,
+    index: bool = True,
+    chunk_rows: int = CHUNK_ROWS,
+) -> None:
+    """Write a frame as TSV in chunks without loss of float precision."""
+    header = [str(c) for c in df.columns]
+    if index:
+        header.insert(0, "" if df.index.name is None else str(df.index.name))
+    with path.open("w", encoding="utf-8", newline="") as fh:
+        fh.write("\t".join(header) + "\n")
+        for start in range(0, len(df), chunk_rows):
+            fh.write(
+                format_rows(
+                    df.iloc[start : start + chunk_rows], sig_figs, index=index
+                )
+            )
@@ -3,8 +3,12 @@
 import sys
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
 import pytest
 import sh
+from svante.combine import aggregate_replicates
+from svante.tsv import write_tsv
 
 from . import COMBINE_INPUTS
 from . import COMBINE_OUTPUTS
@@ -42,3 +46,79 @@ def test_combine(datadir_mgr):
             pytest.fail("combine failed")
         for filestring in COMBINE_OUTPUTS:
             assert Path(filestring).exists()
+
+
+@print_docstring()
+def test_lossless_tsv(tmp_path):
+    """Test that small rates survive a write and re-read unchanged."""
+    df = pd.DataFrame(
+        {"k": [1.2345678901234567e-7, 1.0 / 3.0, np.nan], "±k": [0.1, 2, 3]},
+        index=pd.Index([190, 195, 200], name="T"),
+    )
+    tsv_path = tmp_path / "lossless.tsv"
+    write_tsv(df, tsv_path)
+    reread = pd.read_csv(
+        tsv_path, sep="\t", index_col=0, float_precision="round_trip"
+    )
+    pd.testing.assert_frame_equal(reread, df, check_dtype=False)
+
+
+@print_docstring()
+def test_sig_figs_spare_index(tmp_path):
+    """Test that significant figures do not round temperatures."""
+    df = pd.DataFrame(
+        {"k": [1234.5678, 2345.6789]},
+        index=pd.Index([273.15, 273.45], name="T"),
+    )
+    tsv_path = tmp_path / "rounded.tsv"
+    write_tsv(df, tsv_path, sig_figs=3)
+    assert tsv_path.read_text().splitlines() == [
+        "T\tk",
+        "273.15\t1.23e+03",
+        "273.45\t2.35e+03",
+    ]
+
+
+@print_docstring()
+def test_aggregate_replicates():
+    """Test weighted averaging of replicates into temperature bins."""
+    df = pd.DataFrame(
+        {
+            "±T.k": [0.3, 0.3, 0.3, 0.3],
+            "k": [100.0, 300.0, 500.0, 700.0],
+            "±k": [1.0, 1.0, 2.0, 10.0],
+        },
+        index=pd.Index([189.9, 190.1, 195.0, 195.0], name="T"),
+    )
+    binned = aggregate_replicates(df, bin_width=1.0)
+    assert binned.index.tolist() == [190.0, 195.0]
+    assert binned["k"].tolist() == pytest.approx([200.0, 500.0 + 200 / 26])
+    # scatter of the 190 K pair is far beyond its stated uncertainty
+    assert binned["±k"].iloc[0] == pytest.approx(100.0)
+    assert binned["±T.k"].iloc[0] == pytest.approx(np.hypot(0.3, 0.1))
+    assert binned["±T.k"].iloc[1] == pytest.approx(0.3)
+    exact = aggregate_replicates(df)
+    assert len(exact) == 3
+    assert exact["±k"].iloc[0] == 1.0
+    fine = aggregate_replicates(df, bin_width=0.1)
+    assert fine.index.tolist() == [189.9, 190.1, 195.0]
+
+
+@print_docstring()
+def test_aggregate_without_uncertainties():
+    """Test unweighted fallback and errors for replicates without ±k."""
+    df = pd.DataFrame(
+        {
+            "±T.k": [0.3, 0.3, 0.3, 0.3],
+            "k": [100.0, 300.0, 500.0, 700.0],
+            "±k": [0.0, np.nan, 0.0, 2.0],
+        },
+        index=pd.Index([190.0, 190.0, 195.0, 195.0], name="T"),
+    )
+    aggregated = aggregate_replicates(df)
+    assert aggregated["k"].tolist() == [200.0, 700.0]
+    assert aggregated["±k"].tolist() == pytest.approx([100.0, 2.0])
+    with pytest.raises(ValueError, match="single replicates"):
+        aggregate_replicates(df.iloc[[0, 2, 3]])
+    with pytest.raises(ValueError, match="no values"):
+        aggregate_replicates(df.assign(k=np.nan))
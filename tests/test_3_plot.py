@@ -1,11 +1,19 @@
 """Tests for data ingestion."""
 # standard library imports
+import json
+import os
 import shutil
 import sys
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
 import pytest
 import sh
+from svante.cache import _read_sidecar
+from svante.cache import load_combined
+from svante.cache import parse_combined
+from svante.cache import sidecar_paths
 
 from . import COMBINE_OUTPUTS
 from . import STATS_FILE
@@ -18,6 +26,16 @@ from . import print_docstring
 svante = sh.Command("svante")
 SUBCOMMAND = "plot"
 OUTPUTS = ["arrhenius_plot.png", "svante_stats.json"]
+CACHE_OUTPUTS = [
+    "dielectric_relaxation.tsv.cache.npy",
+    "dielectric_relaxation.tsv.cache.json",
+]
+GRID_TOML = "grid.toml"
+GRID_OUTPUT = "arrhenius_grid.png"
+ROBUST_TOML = "robust.toml"
+ROBUST_OUTPUT = "arrhenius_robust.png"
+ROBUST_OUTLIERS = {"n_outliers(k_H2O)": 0, "n_outliers(k_D2O)": 1}
+ODR_STATS = ["ΔH_ODR(k_H2O)", "ΔH_ODR(k_D2O)"]
 
 
 def test_subcommand_help():
@@ -47,5 +65,91 @@ def test_combine(datadir_mgr):
         except sh.ErrorReturnCode as errors:
             print(errors)
             pytest.fail(f" {SUBCOMMAND} failed")
-        for filestring in OUTPUTS:
+        for filestring in OUTPUTS + CACHE_OUTPUTS:
             assert Path(filestring).exists()
+        with stats_path.open() as fh:
+            stats = json.load(fh)
+        for stat_name in ODR_STATS:
+            assert stat_name in stats
+
+
+@print_docstring()
+def test_grid_plot(datadir_mgr):
+    """Test small-multiples plots rendered in worker processes."""
+    datadir_mgr.add_scope("outputs from combine", module="test_2_combine")
+    with datadir_mgr.in_tmp_dir(inpathlist=[*COMBINE_OUTPUTS, GRID_TOML]):
+        args = [SUBCOMMAND, GRID_TOML]
+        try:
+            svante(
+                args,
+                _out=sys.stderr,
+            )
+        except sh.ErrorReturnCode as errors:
+            print(errors)
+            pytest.fail(f" {SUBCOMMAND} grid failed")
+        assert Path(GRID_OUTPUT).exists()
+
+
+@print_docstring()
+def test_robust_plot(datadir_mgr):
+    """Test robust fits with the outlier in D2O data counted in stats."""
+    datadir_mgr.add_scope("outputs from combine", module="test_2_combine")
+    with datadir_mgr.in_tmp_dir(inpathlist=[*COMBINE_OUTPUTS, ROBUST_TOML]):
+        args = [SUBCOMMAND, ROBUST_TOML]
+        try:
+            svante(
+                args,
+                _out=sys.stderr,
+            )
+        except sh.ErrorReturnCode as errors:
+            print(errors)
+            pytest.fail(f" {SUBCOMMAND} robust failed")
+        assert Path(ROBUST_OUTPUT).exists()
+        with Path(STATS_FILE).open() as fh:
+            stats = json.load(fh)
+        for stat_name, n_outliers in ROBUST_OUTLIERS.items():
+            assert stats[stat_name]["val"] == n_outliers
+
+
+def _is_memmap(values: np.ndarray) -> bool:
+    """Return True if an array is a view of a memory-mapped file."""
+    base = values
+    while base is not None:
+        if isinstance(base, np.memmap):
+            return True
+        base = base.base
+    return False
+
+
+@print_docstring()
+def test_sidecar_cache(tmp_path):
+    """Test that the sidecar is memory-mapped and goes stale on change."""
+    table_path = tmp_path / "combined.tsv"
+    df = pd.DataFrame(
+        {"k": [500.0, 1000.0, 1500.0], "±k": [0.3, 0.3, 1.0]},
+        index=pd.Index([190.0, 195.0, 200.0], name="T"),
+    )
+    df.to_csv(table_path, sep="\t")
+    first = load_combined(table_path)
+    second = load_combined(table_path)
+    for frame in (first, second):
+        assert _is_memmap(frame["k"].to_numpy())
+        pd.testing.assert_frame_equal(frame, parse_combined(table_path))
+    # A new mtime alone makes the sidecar stale.
+    st = table_path.stat()
+    os.utime(table_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert _read_sidecar(table_path) is None
+    df["k"] *= 2.0
+    df.to_csv(table_path, sep="\t")
+    rewritten = load_combined(table_path)
+    assert _is_memmap(rewritten["k"].to_numpy())
+    assert rewritten["k"].tolist() == [1000.0, 2000.0, 3000.0]
+    # Metadata missing a key falls back to parsing the table.
+    meta_path = sidecar_paths(table_path)[1]
+    meta = json.loads(meta_path.read_text())
+    del meta["columns"]
+    meta_path.write_text(json.dumps(meta))
+    assert _read_sidecar(table_path) is None
+    pd.testing.assert_frame_equal(
+        load_combined(table_path), parse_combined(table_path)
+    )
@@ -0,0 +1,59 @@
+"""Tests for single-process pipeline."""
+# standard library imports
+import sys
+from pathlib import Path
+
+import pytest
+import sh
+
+from . import COMBINE_INPUTS
+from . import COMBINE_OUTPUTS
+from . import TOML_FILE
+from . import help_check
+from . import print_docstring
+
+
+# global constants
+svante = sh.Command("svante")
+SUBCOMMAND = "run"
+OUTPUTS = ["arrhenius_plot.png", "svante_stats.json"]
+
+
+def test_subcommand_help():
+    """Test subcommand help message."""
+    help_check(SUBCOMMAND)
+
+
+@print_docstring()
+def test_run(datadir_mgr):
+    """Test combining, fitting, and plotting in one process."""
+    with datadir_mgr.in_tmp_dir(inpathlist=COMBINE_INPUTS):
+        args = [SUBCOMMAND, TOML_FILE]
+        try:
+            svante(
+                args,
+                _out=sys.stderr,
+            )
+        except sh.ErrorReturnCode as errors:
+            print(errors)
+            pytest.fail(f"{SUBCOMMAND} failed")
+        for filestring in OUTPUTS + COMBINE_OUTPUTS:
+            assert Path(filestring).exists()
+
+
+@print_docstring()
+def test_run_no_write(datadir_mgr):
+    """Test pipeline without writing the combined table."""
+    with datadir_mgr.in_tmp_dir(inpathlist=COMBINE_INPUTS):
+        args = [SUBCOMMAND, "--no-write", TOML_FILE]
+        try:
+            svante(
+                args,
+                _out=sys.stderr,
+            )
+        except sh.ErrorReturnCode as errors:
+            print(errors)
+            pytest.fail(f"{SUBCOMMAND} failed")
+        assert Path(OUTPUTS[0]).exists()
+        for filestring in COMBINE_OUTPUTS:
+            assert not Path(filestring).exists()
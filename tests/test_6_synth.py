@@ -0,0 +1,53 @@
+"""Tests for synthetic dataset generation."""
+# standard library imports
+import sys
+from pathlib import Path
+
+import pytest
+import sh
+
+from . import help_check
+from . import print_docstring
+from . import working_directory
+
+
+# global constants
+svante = sh.Command("svante")
+SUBCOMMAND = "synth"
+SYNTH_DIR = "synth"
+SYNTH_TOML = "synth.toml"
+SYNTH_INPUTS = ["synth_0.tsv", "synth_1.tsv", SYNTH_TOML]
+SYNTH_OUTPUTS = ["synth_combined.tsv", "synth_plot.png"]
+
+
+def test_subcommand_help():
+    """Test subcommand help message."""
+    help_check(SUBCOMMAND)
+
+
+@print_docstring()
+def test_synth_isotope(tmp_path):
+    """Test generating isotope-pair data and running the pipeline on it."""
+    with working_directory(tmp_path):
+        args = [SUBCOMMAND, SYNTH_DIR, "--kind=isotope", "--n-rows=50"]
+        try:
+            svante(
+                args,
+                _out=sys.stderr,
+            )
+        except sh.ErrorReturnCode as errors:
+            print(errors)
+            pytest.fail(f"{SUBCOMMAND} failed")
+        for filestring in SYNTH_INPUTS:
+            assert (Path(SYNTH_DIR) / filestring).exists()
+    with working_directory(tmp_path / SYNTH_DIR):
+        try:
+            svante(
+                ["run", SYNTH_TOML],
+                _out=sys.stderr,
+            )
+        except sh.ErrorReturnCode as errors:
+            print(errors)
+            pytest.fail(f"run on {SUBCOMMAND} output failed")
+        for filestring in SYNTH_OUTPUTS:
+            assert Path(filestring).exists()
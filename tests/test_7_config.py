@@ -0,0 +1,61 @@
+"""Tests for configuration validation."""
+# standard library imports
+from pathlib import Path
+
+import pytest
+import sh
+from svante.config import ConfigError
+from svante.config import PlotConfig
+from svante.config import load_config
+
+from . import TOML_FILE
+from . import print_docstring
+from . import working_directory
+
+
+# global constants
+svante = sh.Command("svante")
+TESTDATA = Path(__file__).parent / "testdata"
+BAD_TOML = "bad.toml"
+BAD_EDITS = {
+    "dpi = 200": 'dpi = "high"',
+    'label = "Fake in D$_2$O"': 'label = ""',
+    "add_fit_values = true": 'add_fit_values = true\ncolour = "red"',
+    "line_label_loc = [3.9, 7.15]": "line_label_loc = [3.9]",
+}
+EXPECTED_ERRORS = [
+    "combined.rates[1].label",
+    "combined.rates[1].line_label_loc",
+    "plot.savefig.dpi",
+    "plot.colour",
+]
+
+
+@print_docstring()
+def test_memoized_config(tmp_path):
+    """Test that unchanged configurations are parsed only once."""
+    toml_path = tmp_path / TOML_FILE
+    toml_path.write_text((TESTDATA / TOML_FILE).read_text())
+    conf = load_config(toml_path, PlotConfig)
+    assert load_config(toml_path, PlotConfig) is conf
+    assert conf.combined.rates[1].name == "k_D2O"
+    with pytest.raises(AttributeError):
+        conf.combined.title = "changed"
+
+
+@print_docstring()
+def test_all_errors_reported(tmp_path):
+    """Test that every error in a configuration is reported at once."""
+    text = (TESTDATA / TOML_FILE).read_text()
+    for old, new in BAD_EDITS.items():
+        text = text.replace(old, new)
+    with working_directory(tmp_path):
+        Path(BAD_TOML).write_text(text)
+        with pytest.raises(ConfigError) as excinfo:
+            load_config(Path(BAD_TOML), PlotConfig)
+        assert len(excinfo.value.errors) == len(EXPECTED_ERRORS)
+        with pytest.raises(sh.ErrorReturnCode) as cli_excinfo:
+            svante(["plot", BAD_TOML])
+        stderr = cli_excinfo.value.stderr.decode()
+        for error in EXPECTED_ERRORS:
+            assert error in stderr
@@ -0,0 +1,107 @@
+"""Tests for rate prediction on temperature grids."""
+# standard library imports
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import sh
+from svante.predict import write_predictions
+
+from . import COMBINE_INPUTS
+from . import TOML_FILE
+from . import help_check
+from . import print_docstring
+
+
+# global constants
+svante = sh.Command("svante")
+SUBCOMMAND = "predict"
+FITS_FILE = "dielectric_relaxation.tsv.fits.json"
+GRID_FILE = "grid.tsv"
+N_GRID = 1001
+RATE_COLS = ["k_H2O", "k_D2O"]
+
+
+def test_subcommand_help():
+    """Test subcommand help message."""
+    help_check(SUBCOMMAND)
+
+
+@print_docstring()
+def test_predict(datadir_mgr):
+    """Test predicting from saved fits and refitting to Parquet."""
+    with datadir_mgr.in_tmp_dir(inpathlist=COMBINE_INPUTS):
+        pd.DataFrame({"T": np.linspace(180.0, 280.0, N_GRID)}).to_csv(
+            GRID_FILE, sep="\t", index=False
+        )
+        try:
+            svante(["run", TOML_FILE], _out=sys.stderr)
+            assert Path(FITS_FILE).exists()
+            svante(
+                [SUBCOMMAND, TOML_FILE, GRID_FILE, "predicted.tsv"],
+                _out=sys.stderr,
+            )
+            svante(
+                [
+                    SUBCOMMAND,
+                    "--refit",
+                    TOML_FILE,
+                    GRID_FILE,
+                    "predicted.parquet",
+                ],
+                _out=sys.stderr,
+            )
+        except sh.ErrorReturnCode as errors:
+            print(errors)
+            pytest.fail(f"{SUBCOMMAND} failed")
+        saved = pd.read_csv(
+            "predicted.tsv",
+            sep="\t",
+            index_col=0,
+            float_precision="round_trip",
+        )
+        refit = pd.read_parquet("predicted.parquet")
+        assert len(saved) == N_GRID
+        pd.testing.assert_frame_equal(saved, refit)
+        for col in RATE_COLS:
+            assert (saved[f"{col}.pi_low"] < saved[f"{col}.ci_low"]).all()
+            assert (saved[f"{col}.ci_low"] < saved[col]).all()
+            assert (saved[col] < saved[f"{col}.ci_high"]).all()
+            assert (saved[f"{col}.ci_high"] < saved[f"{col}.pi_high"]).all()
+
+
+@print_docstring()
+def test_no_fits_of_rounded_table(datadir_mgr):
+    """Test that run saves no fits for a table it writes rounded."""
+    with datadir_mgr.in_tmp_dir(inpathlist=COMBINE_INPUTS):
+        toml_path = Path(TOML_FILE)
+        toml_path.write_text(
+            toml_path.read_text().replace(
+                "[combined]\n", "[combined]\nsignificant_figures = 3\n"
+            )
+        )
+        try:
+            svante(["run", TOML_FILE], _out=sys.stderr)
+        except sh.ErrorReturnCode as errors:
+            print(errors)
+            pytest.fail("run failed")
+        assert not Path(FITS_FILE).exists()
+
+
+@print_docstring()
+def test_sig_figs_spare_temperatures(tmp_path):
+    """Test that rounding predicted rates leaves grid temperatures intact."""
+    temps = pd.Index([273.15, 298.15], name="T")
+    frames = [
+        pd.DataFrame({"k": [1234.5678]}, index=temps[:1]),
+        pd.DataFrame({"k": [2345.6789]}, index=temps[1:]),
+    ]
+    out_path = tmp_path / "rounded.tsv"
+    assert write_predictions(frames, out_path, sig_figs=3) == len(temps)
+    assert out_path.read_text().splitlines() == [
+        "T\tk",
+        "273.15\t1.23e+03",
+        "298.15\t2.35e+03",
+    ]
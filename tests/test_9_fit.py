@@ -0,0 +1,138 @@
+"""Tests for batched line fits."""
+# standard library imports
+import tracemalloc
+
+import numpy as np
+import pytest
+from scipy import odr  # type: ignore
+from scipy import stats  # type: ignore
+from svante.fit import FITTERS
+from svante.fit import MAX_PAIR_SLOPES
+from svante.fit import MAX_PAIRS
+from svante.fit import ArrheniusArrays
+from svante.fit import ols_fit
+from svante.fit import theil_sen_fit
+from svante.fit import york_fit
+
+from . import print_docstring
+
+
+# global constants
+N_POINTS = 20
+SLOPE = -2.6
+INTERCEPT = 14.0
+SIGMA_X = 0.01
+SIGMA_Y = 0.05
+OUTLIER_ROW = 2
+OUTLIER_SHIFT = 1.5  # in log10(rate), about 30 SIGMA_Y
+ROBUST_METHODS = ["huber", "theil-sen", "ransac"]
+
+
+def synthetic_points(
+    sigma_x: float = SIGMA_X, seed: int = 0, n_points: int = N_POINTS
+) -> ArrheniusArrays:
+    """Return one column of noisy points on a line."""
+    rng = np.random.default_rng(seed)
+    x_true = np.linspace(3.8, 5.2, n_points)
+    x = x_true + rng.normal(0.0, sigma_x, n_points) if sigma_x else x_true
+    y = INTERCEPT + SLOPE * x_true + rng.normal(0.0, SIGMA_Y, n_points)
+    return ArrheniusArrays(
+        x[:, np.newaxis],
+        y[:, np.newaxis],
+        np.full((n_points, 1), sigma_x),
+        np.full((n_points, 1), SIGMA_Y),
+    )
+
+
+@print_docstring()
+def test_york_matches_odr():
+    """Test errors-in-variables fit against ODRPACK."""
+    points = synthetic_points()
+    fits = york_fit(points)
+    data = odr.RealData(
+        points.x[:, 0], points.y[:, 0], sx=points.sx[:, 0], sy=points.sy[:, 0]
+    )
+    result = odr.ODR(data, odr.unilinear, beta0=[SLOPE, INTERCEPT]).run()
+    assert fits.slope[0] == pytest.approx(result.beta[0], rel=1e-6)
+    assert fits.intercept[0] == pytest.approx(result.beta[1], rel=1e-6)
+    assert fits.slope_std[0] == pytest.approx(result.sd_beta[0], rel=1e-4)
+    assert fits.intercept_std[0] == pytest.approx(
+        result.sd_beta[1], rel=1e-4
+    )
+
+
+@print_docstring()
+def test_york_without_x_errors_is_ols():
+    """Test that errors-in-variables fit reduces to OLS without x errors."""
+    points = synthetic_points(sigma_x=0.0)
+    fits = york_fit(points)
+    ols = stats.linregress(points.x[:, 0], points.y[:, 0])
+    assert fits.slope[0] == pytest.approx(ols.slope)
+    assert fits.intercept[0] == pytest.approx(ols.intercept)
+    assert fits.slope_std[0] == pytest.approx(ols.stderr)
+    assert fits.intercept_std[0] == pytest.approx(ols.intercept_stderr)
+
+
+@print_docstring()
+@pytest.mark.parametrize("method", ROBUST_METHODS)
+def test_robust_fit_rejects_outlier(method):
+    """Test that robust fits ignore a planted outlier and flag only it."""
+    # Normal quantiles in shuffled order give Gaussian scatter without
+    # chance tails, so only the planted point lies beyond OUTLIER_CUT.
+    rng = np.random.default_rng(0)
+    quantiles = (np.arange(N_POINTS) + 0.5) / N_POINTS
+    noise = SIGMA_Y * rng.permutation(stats.norm.ppf(quantiles))
+    x = np.linspace(3.8, 5.2, N_POINTS)[:, np.newaxis]
+    sigmas = np.full((N_POINTS, 1), SIGMA_Y)
+    clean = ArrheniusArrays(
+        x, INTERCEPT + SLOPE * x + noise[:, np.newaxis], sigmas * 0.0, sigmas
+    )
+    y = clean.y.copy()
+    y[OUTLIER_ROW] += OUTLIER_SHIFT
+    points = clean._replace(y=y)
+    fits = FITTERS[method](points)
+    expected = ols_fit(clean)
+    if method == "theil-sen":
+        expected_slope = stats.theilslopes(y[:, 0], points.x[:, 0]).slope
+        assert fits.slope[0] == pytest.approx(expected_slope)
+    assert fits.slope[0] == pytest.approx(expected.slope[0], abs=0.05)
+    assert fits.intercept[0] == pytest.approx(expected.intercept[0], abs=0.25)
+    # The planted outlier pulls an OLS fit beyond the tolerance.
+    assert abs(ols_fit(points).slope[0] - expected.slope[0]) > 0.05
+    assert np.flatnonzero(fits.outliers[:, 0]).tolist() == [OUTLIER_ROW]
+
+
+@print_docstring()
+def test_theil_sen_subsampled():
+    """Test Theil-Sen on more points than it has pairs to spare."""
+    n_points = 1000
+    assert n_points * (n_points - 1) // 2 > MAX_PAIRS
+    points = synthetic_points(sigma_x=0.0, n_points=n_points)
+    fits = theil_sen_fit(points)
+    expected = stats.theilslopes(points.y[:, 0], points.x[:, 0])
+    assert fits.slope[0] == pytest.approx(expected.slope, abs=0.01)
+
+
+@print_docstring()
+def test_theil_sen_many_columns():
+    """Test that Theil-Sen memory stays bounded as columns are added."""
+    n_points, n_cols = 700, 40
+    n_pairs = min(n_points * (n_points - 1) // 2, MAX_PAIRS)
+    assert n_pairs * n_cols > MAX_PAIR_SLOPES
+    columns = [
+        synthetic_points(sigma_x=0.0, seed=i, n_points=n_points)
+        for i in range(n_cols)
+    ]
+    points = ArrheniusArrays(
+        *(np.hstack(arrays) for arrays in zip(*columns))
+    )
+    tracemalloc.start()
+    try:
+        fits = theil_sen_fit(points)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # Less than one float64 slope for every pair of every column.
+    assert peak < n_pairs * n_cols * 8
+    for i, column in enumerate(columns):
+        assert fits.slope[i] == theil_sen_fit(column).slope[0]